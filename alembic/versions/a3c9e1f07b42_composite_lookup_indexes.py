@@ -0,0 +1,31 @@
+"""composite indexes for license and subscription lookups
+
+Revision ID: a3c9e1f07b42
+Revises: 65912f006026
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e1f07b42'
+down_revision: Union[str, Sequence[str], None] = '65912f006026'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # /validate-license: solo licencias activas (PostgreSQL reduce "is_active = true" a "is_active")
+    op.create_index('ix_licenses_user_machine_active', 'licenses', ['user_id', 'machine_id'],
+                    postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active = 1'))
+    # /license/activate: suscripción activa y vigente del usuario
+    op.create_index('ix_subscriptions_user_status_end', 'subscriptions', ['user_id', 'status', 'end_date'])
+    # /auth/reset-password ya usa el índice único de token
+
+def downgrade():
+    op.drop_index('ix_subscriptions_user_status_end', table_name='subscriptions')
+    op.drop_index('ix_licenses_user_machine_active', table_name='licenses')
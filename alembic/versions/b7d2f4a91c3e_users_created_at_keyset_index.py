@@ -0,0 +1,26 @@
+"""users (created_at, id) index for keyset pagination
+
+Revision ID: b7d2f4a91c3e
+Revises: a3c9e1f07b42
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f4a91c3e'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e1f07b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # /admin/users ordena y pagina por (created_at, id)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+
+def downgrade():
+    op.drop_index('ix_users_created_at_id', table_name='users')
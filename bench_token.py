@@ -0,0 +1,92 @@
+# bench_token.py
+"""
+Prueba de carga de /token: muchos logins concurrentes y, en paralelo, /healthz
+para comprobar que el servidor sigue respondiendo mientras se hashea.
+
+    uvicorn server.main:app --port 8000
+    python bench_token.py
+
+Variables: BENCH_URL, BENCH_EMAIL, BENCH_PASSWORD, BENCH_REQUESTS, BENCH_CONCURRENCY.
+"""
+import asyncio
+import os
+import time
+from collections import Counter
+
+import httpx
+
+BASE_URL = os.getenv("BENCH_URL", "http://127.0.0.1:8000")
+EMAIL = os.getenv("BENCH_EMAIL", "bench@multiverse.local")
+PASSWORD = os.getenv("BENCH_PASSWORD", "bench-password")
+TOTAL = int(os.getenv("BENCH_REQUESTS", "200"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "50"))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def report(name, latencies):
+    print(f"   {name}: p50 {percentile(latencies, 50) * 1000:.0f} ms · "
+          f"p95 {percentile(latencies, 95) * 1000:.0f} ms · "
+          f"p99 {percentile(latencies, 99) * 1000:.0f} ms · máx {max(latencies, default=0) * 1000:.0f} ms")
+
+
+async def login(client, semaphore, statuses, latencies):
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            resp = await client.post("/token", data={"username": EMAIL, "password": PASSWORD})
+            statuses[resp.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - start)
+
+
+async def probe_health(client, stop, latencies, failures):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            resp = await client.get("/healthz", timeout=5)
+            if resp.status_code != 200:
+                failures.append(resp.status_code)
+        except httpx.HTTPError as e:
+            failures.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.1)
+
+
+async def main():
+    limits = httpx.Limits(max_connections=CONCURRENCY + 5)
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60, limits=limits) as client:
+        try:
+            await client.post("/register", data={"email": EMAIL, "password": PASSWORD})
+        except httpx.HTTPError as e:
+            print(f"❌ No se pudo conectar a {BASE_URL}: {e}")
+            return
+
+        statuses, login_latencies = Counter(), []
+        health_latencies, health_failures = [], []
+        stop = asyncio.Event()
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+        health = asyncio.create_task(probe_health(client, stop, health_latencies, health_failures))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(login(client, semaphore, statuses, login_latencies) for _ in range(TOTAL)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await health
+
+    print(f"✅ {TOTAL} logins en {elapsed:.2f} s ({TOTAL / elapsed:.1f}/s, concurrencia {CONCURRENCY})")
+    print(f"   Respuestas: {dict(statuses)}")
+    report("/token ", login_latencies)
+    report("/healthz", health_latencies)
+    if health_failures:
+        print(f"⚠️ /healthz falló {len(health_failures)} veces: {Counter(health_failures)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,85 +1,280 @@
 # core/emulator_manager.py
 import subprocess
 import os
-import sqlite3
+import json
 from pathlib import Path
 import time
 import threading
-from datetime import datetime
-
-EMULATOR_COMMANDS = {
-    "PS1": ["{emulator}", "{rom}"],
-    "PS2": ["{emulator}", "{rom}"],
-    "PS3": ["{emulator}", "{rom}"],
-    "Xbox 360": ["{emulator}", "{rom}"],
-    "Wii": ["{emulator}", "-e", "{rom}"],
-    "WiiU": ["{emulator}", "-g", "{rom}"],
-    "Switch": ["{emulator}", "-g", "{rom}"],
-    "NES": ["{emulator}", "{rom}"]
-}
-
-_game_start_time = None
-_current_game_id = None
+from concurrent.futures import ThreadPoolExecutor
+from database.connection import get_connection, close_connection
+from core.stats_manager import record_session
+from core.emulator_profiles import build_command
+from core.resource_monitor import ResourceSampler, RESOURCE_MONITOR_ENABLED
+from core.process_policy import resolve_policy, apply_policy, LauncherThrottle, LAUNCHER_THROTTLE_ENABLED
 
-def launch_game(game_id):
-    global _game_start_time, _current_game_id
-    conn = sqlite3.connect("database/multiverse.db")
+# Precarga al enfocar una tarjeta: MB iniciales de la ROM y del emulador que se llevan a la caché del sistema
+PREFETCH_ENABLED = os.getenv("MULTIVERSE_PREFETCH", "1") == "1"
+PREFETCH_MB = int(os.getenv("MULTIVERSE_PREFETCH_MB", "64"))
+# Segundos antes de volver a precargar el mismo juego
+PREFETCH_TTL = 120
+# Emuladores abiertos a la vez como máximo
+MAX_RUNNING_EMULATORS = int(os.getenv("MULTIVERSE_MAX_EMULATORS", "1"))
+# Segundos en los que un segundo pedido del mismo juego se considera repetido (doble clic, botón A)
+LAUNCH_DEBOUNCE = 2.0
+_READ_CHUNK = 1024 * 1024
+
+class GameSession:
+    """Una partida: el proceso del emulador con su inicio, fin y código de salida reales."""
+
+    def __init__(self, game_id, console_name, process):
+        self.game_id = game_id
+        self.console_name = console_name
+        self.process = process
+        self.started_at = time.time()
+        self.ended_at = None
+        self.exit_code = None
+        self.launch_latency = None
+        self.sampler = None
+        self.resources = None
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    @property
+    def is_running(self):
+        return self.ended_at is None
+
+    @property
+    def duration(self):
+        return int((self.ended_at or time.time()) - self.started_at)
+
+
+class SessionTracker:
+    """
+    Sigue las partidas en curso. Cada sesión tiene un hilo que espera la salida de su
+    proceso y recién entonces guarda las estadísticas, así que varias partidas
+    simultáneas no se pisan.
+
+    Los listeners se llaman como listener(evento, sesión) con "started" o "ended";
+    "ended" llega desde el hilo de la sesión.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def running_sessions(self):
+        with self._lock:
+            return list(self._sessions.values())
+
+    def start(self, game_id, console_name, process):
+        session = GameSession(game_id, console_name, process)
+        with self._lock:
+            self._sessions[session.pid] = session
+        if RESOURCE_MONITOR_ENABLED:
+            session.sampler = ResourceSampler(session.pid)
+            session.sampler.start()
+        threading.Thread(target=self._wait, args=(session,), daemon=True).start()
+        self._notify("started", session)
+        return session
+
+    def _wait(self, session):
+        try:
+            session.exit_code = session.process.wait()
+            session.ended_at = time.time()
+            if session.sampler is not None:
+                session.resources = session.sampler.stop()
+            record_session(session)
+        except Exception as e:
+            print(f"Error al registrar estadísticas: {e}")
+        finally:
+            # La sesión terminó aunque no se hayan podido guardar las estadísticas
+            with self._lock:
+                self._sessions.pop(session.pid, None)
+            self._notify("ended", session)
+            close_connection()
+
+    def _notify(self, event, session):
+        for listener in list(self._listeners):
+            try:
+                listener(event, session)
+            except Exception as e:
+                print(f"⚠️ Error en listener de sesión: {e}")
+
+
+tracker = SessionTracker()
+if LAUNCHER_THROTTLE_ENABLED:
+    tracker.add_listener(LauncherThrottle(tracker))
+
+_launch_cache = {}      # game_id -> (cmd, cwd, consola, rom, emulador, política de proceso)
+_prefetched = {}        # game_id -> momento de la última precarga
+_latest_prefetch = None
+_cache_lock = threading.Lock()
+_prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+
+def _resolve_launch(game_id):
+    """Línea de comando del juego, resuelta una sola vez por juego."""
+    with _cache_lock:
+        entry = _launch_cache.get(game_id)
+    if entry is not None:
+        return entry
+    conn = get_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT g.path, c.name, c.emulator_path
+        SELECT g.path, c.name, c.emulator_path, g.graphics_profile
         FROM games g
         JOIN consoles c ON g.console_id = c.id
         WHERE g.id = ?
     """, (game_id,))
     result = cursor.fetchone()
-    conn.close()
-    if not result:
-        return False
-    rom_path, console_name, emulator_path = result
-    if not emulator_path or not os.path.exists(emulator_path) or not os.path.exists(rom_path):
-        return False
-    cmd_template = EMULATOR_COMMANDS.get(console_name, ["{emulator}", "{rom}"])
-    cmd = [part.format(emulator=emulator_path, rom=rom_path) for part in cmd_template]
+    if not result or not result[2]:
+        return None
+    rom_path, console_name, emulator_path, graphics_profile = result
     try:
-        subprocess.Popen(cmd, cwd=Path(emulator_path).parent)
-        _game_start_time = time.time()
-        _current_game_id = game_id
-        threading.Thread(target=_monitor_game, args=(game_id,), daemon=True).start()
-        return True
-    except:
-        return False
-
-def _monitor_game(game_id):
-    """Registra estadísticas cuando el juego termina."""
-    global _game_start_time, _current_game_id
+        graphics_profile = json.loads(graphics_profile) if graphics_profile else {}
+    except ValueError:
+        graphics_profile = {}
+    cmd = build_command(console_name, emulator_path, rom_path, graphics_profile)
+    policy = resolve_policy(console_name, graphics_profile)
+    entry = (cmd, str(Path(emulator_path).parent), console_name, rom_path, emulator_path, policy)
+    with _cache_lock:
+        _launch_cache[game_id] = entry
+    return entry
+
+def invalidate_launch_cache(game_id=None):
+    """Descarta las líneas de comando resueltas (al cambiar rutas de emuladores o perfiles gráficos)."""
+    with _cache_lock:
+        if game_id is None:
+            _launch_cache.clear()
+            _prefetched.clear()
+        else:
+            _launch_cache.pop(game_id, None)
+            _prefetched.pop(game_id, None)
+
+def _read_ahead(path, limit):
+    """Lleva a la caché de páginas los primeros limit bytes del archivo."""
+    if not os.path.isfile(path):
+        return
+    with open(path, "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            # El kernel lee en segundo plano; no copia nada a este proceso
+            os.posix_fadvise(f.fileno(), 0, limit, os.POSIX_FADV_WILLNEED)
+            return
+        remaining = limit
+        while remaining > 0:
+            chunk = f.read(min(_READ_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+
+def _prefetch(game_id):
+    if game_id != _latest_prefetch:
+        # El foco ya pasó a otra tarjeta: descartar y permitir reintentar después
+        with _cache_lock:
+            _prefetched.pop(game_id, None)
+        return
     try:
-        time.sleep(10)
-        if _current_game_id == game_id and _game_start_time:
-            duration = int(time.time() - _game_start_time)
-            _save_game_stats(game_id, duration)
-            _game_start_time = None
-            _current_game_id = None
-    except Exception as e:
-        print(f"Error al registrar estadísticas: {e}")
-
-def _save_game_stats(game_id, duration):
-    """Guarda las estadísticas en la base de datos local."""
-    conn = sqlite3.connect("database/multiverse.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS game_stats (
-        game_id INTEGER PRIMARY KEY,
-        play_count INTEGER DEFAULT 0,
-        total_time INTEGER DEFAULT 0,
-        last_played TIMESTAMP
-    )""")
-    cursor.execute("""
-        INSERT INTO game_stats (game_id, play_count, total_time, last_played)
-        VALUES (?, 1, ?, ?)
-        ON CONFLICT(game_id) DO UPDATE SET
-            play_count = play_count + 1,
-            total_time = total_time + ?,
-            last_played = ?
-    """, (game_id, duration, datetime.now(), duration, datetime.now()))
-    conn.commit()
-    conn.close()
\ No newline at end of file
+        entry = _resolve_launch(game_id)
+        if entry is None:
+            return
+        limit = PREFETCH_MB * 1024 * 1024
+        _read_ahead(entry[4], limit)
+        _read_ahead(entry[3], limit)
+    except OSError as e:
+        print(f"⚠️ No se pudo precargar el juego {game_id}: {e}")
+
+def prefetch_game(game_id):
+    """
+    Precarga en segundo plano la línea de comando, el emulador y el inicio de la ROM
+    de un juego (al enfocar o pasar el mouse por su tarjeta). Solo se atiende la
+    última tarjeta pedida, así recorrer la grilla no encola lecturas.
+    """
+    global _latest_prefetch
+    if not PREFETCH_ENABLED or game_id is None:
+        return
+    now = time.time()
+    with _cache_lock:
+        if now - _prefetched.get(game_id, 0) < PREFETCH_TTL:
+            return
+        _prefetched[game_id] = now
+    _latest_prefetch = game_id
+    _prefetch_pool.submit(_prefetch, game_id)
+
+def launch_game(game_id):
+    """Lanza el juego y devuelve su GameSession, o None si no se pudo lanzar."""
+    started = time.perf_counter()
+    cached = game_id in _launch_cache
+    prefetched = game_id in _prefetched
+    entry = _resolve_launch(game_id)
+    if entry is None:
+        return None
+    cmd, cwd, console_name, rom_path, emulator_path, policy = entry
+    if not os.path.exists(emulator_path) or not os.path.exists(rom_path):
+        invalidate_launch_cache(game_id)
+        return None
+    try:
+        process = subprocess.Popen(cmd, cwd=cwd)
+    except OSError as e:
+        print(f"❌ No se pudo iniciar el emulador: {e}")
+        invalidate_launch_cache(game_id)
+        return None
+    apply_policy(process.pid, policy)
+    session = tracker.start(game_id, console_name, process)
+    session.launch_latency = time.perf_counter() - started
+    print(f"🚀 Juego lanzado en {session.launch_latency * 1000:.1f} ms "
+          f"(comando {'en caché' if cached else 'resuelto'}, {'precargado' if prefetched else 'sin precarga'}).")
+    return session
+
+
+class LaunchSupervisor:
+    """
+    Punto único para lanzar juegos desde la interfaz. Atiende los pedidos de a uno,
+    descarta los repetidos (doble clic, botón A mantenido) y respeta el máximo de
+    emuladores abiertos a la vez.
+
+    launch() devuelve (sesión, estado) con estado:
+      - "started":   se lanzó el juego
+      - "duplicate": el juego ya se está ejecutando o se pidió hace un instante
+      - "busy":      se alcanzó el máximo de emuladores abiertos
+      - "failed":    no se pudo lanzar (rutas inválidas o error del emulador)
+    """
+
+    def __init__(self, session_tracker, max_running=MAX_RUNNING_EMULATORS, debounce=LAUNCH_DEBOUNCE):
+        self.tracker = session_tracker
+        self.max_running = max_running
+        self.debounce = debounce
+        self._last_request = {}
+        self._lock = threading.Lock()
+
+    def running_sessions(self):
+        return self.tracker.running_sessions()
+
+    def session_for(self, game_id):
+        for session in self.tracker.running_sessions():
+            if session.game_id == game_id:
+                return session
+        return None
+
+    def launch(self, game_id):
+        with self._lock:
+            now = time.monotonic()
+            running = self.session_for(game_id)
+            if running is not None or now - self._last_request.get(game_id, float("-inf")) < self.debounce:
+                return running, "duplicate"
+            self._last_request[game_id] = now
+            if self.max_running and len(self.tracker.running_sessions()) >= self.max_running:
+                return None, "busy"
+            session = launch_game(game_id)
+            return session, ("started" if session else "failed")
+
+
+supervisor = LaunchSupervisor(tracker)
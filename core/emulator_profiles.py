@@ -0,0 +1,150 @@
+# core/emulator_profiles.py
+"""
+Registro de emuladores: cómo se arma la línea de comando de cada uno y cómo se
+traduce el perfil gráfico del juego (resolution, textures, fps_limit, guardado por
+GraphicsSettingsWindow) a flags reales del emulador.
+
+Los perfiles se compilan una sola vez al importar el módulo; lanzar un juego es
+buscar el constructor del emulador y formatear sus argumentos.
+"""
+
+import os
+from functools import lru_cache
+
+# Perfiles por emulador.
+#   match:    fragmentos del nombre del ejecutable que identifican al emulador
+#   command:  plantilla de argumentos ({emulator} y {rom})
+#   settings: clave del perfil gráfico -> {valor: argumentos extra}. Los valores que
+#             no figuran (o las claves que el emulador no acepta por línea de comando)
+#             no agregan nada y el emulador usa su propia configuración.
+EMULATOR_PROFILES = {
+    "duckstation": {
+        "match": ("duckstation",),
+        "command": ["{emulator}", "{rom}"],
+    },
+    "pcsx2": {
+        "match": ("pcsx2",),
+        "command": ["{emulator}", "{rom}"],
+    },
+    "rpcs3": {
+        "match": ("rpcs3",),
+        "command": ["{emulator}", "{rom}"],
+    },
+    "xenia": {
+        "match": ("xenia",),
+        "command": ["{emulator}", "{rom}"],
+        "settings": {
+            # Xbox 360 renderiza a 1280x720: escala entera más cercana a la resolución pedida
+            "resolution": {
+                "Nativo": ["--draw_resolution_scale_x=1", "--draw_resolution_scale_y=1"],
+                "1280x720": ["--draw_resolution_scale_x=1", "--draw_resolution_scale_y=1"],
+                "1920x1080": ["--draw_resolution_scale_x=2", "--draw_resolution_scale_y=2"],
+                "2560x1440": ["--draw_resolution_scale_x=2", "--draw_resolution_scale_y=2"],
+            },
+            "fps_limit": {
+                30: ["--framerate_limit=30"],
+                60: ["--framerate_limit=60"],
+                120: ["--framerate_limit=120"],
+                0: ["--framerate_limit=0"],
+            },
+        },
+    },
+    "dolphin": {
+        "match": ("dolphin",),
+        "command": ["{emulator}", "-e", "{rom}"],
+        "settings": {
+            # Resolución interna como múltiplo de la nativa (~640x528)
+            "resolution": {
+                "Nativo": ["-C", "GFX.Settings.InternalResolution=1"],
+                "1280x720": ["-C", "GFX.Settings.InternalResolution=2"],
+                "1920x1080": ["-C", "GFX.Settings.InternalResolution=3"],
+                "2560x1440": ["-C", "GFX.Settings.InternalResolution=4"],
+            },
+            # Filtrado anisotrópico: 0 = 1x ... 4 = 16x
+            "textures": {
+                "Baja": ["-C", "GFX.Enhancements.MaxAnisotropy=0"],
+                "Media": ["-C", "GFX.Enhancements.MaxAnisotropy=1"],
+                "Alta": ["-C", "GFX.Enhancements.MaxAnisotropy=2"],
+                "Ultra": ["-C", "GFX.Enhancements.MaxAnisotropy=4"],
+            },
+            # Dolphin limita por velocidad de emulación, no por FPS: solo "Sin límite" tiene equivalente
+            "fps_limit": {
+                0: ["-C", "Dolphin.Core.EmulationSpeed=0"],
+            },
+        },
+    },
+    "cemu": {
+        "match": ("cemu",),
+        "command": ["{emulator}", "-g", "{rom}"],
+    },
+    "yuzu": {
+        "match": ("yuzu", "suyu", "sudachi", "citron"),
+        "command": ["{emulator}", "-g", "{rom}"],
+    },
+    "generic": {
+        "match": (),
+        "command": ["{emulator}", "{rom}"],
+    },
+}
+
+# Emulador que se asume para cada consola si el ejecutable no coincide con ningún perfil
+CONSOLE_EMULATORS = {
+    "PS1": "duckstation",
+    "PS2": "pcsx2",
+    "PS3": "rpcs3",
+    "Xbox 360": "xenia",
+    "Wii": "dolphin",
+    "WiiU": "cemu",
+    "Switch": "yuzu",
+    "NES": "generic",
+}
+
+# Orden de las claves del perfil gráfico en la línea de comando
+PROFILE_KEYS = ("resolution", "textures", "fps_limit")
+
+
+def _compile(profile):
+    """Convierte un perfil en una función (emulador, rom, perfil_gráfico) -> argv."""
+    command = tuple(profile["command"])
+    settings = tuple(
+        (key, {value: tuple(args) for value, args in profile.get("settings", {}).get(key, {}).items()})
+        for key in PROFILE_KEYS
+        if key in profile.get("settings", {})
+    )
+
+    def build(emulator, rom, graphics_profile=None):
+        argv = [part.format(emulator=emulator, rom=rom) for part in command]
+        if graphics_profile:
+            extra = []
+            for key, values in settings:
+                extra.extend(values.get(graphics_profile.get(key), ()))
+            # Los flags van justo después del ejecutable
+            argv[1:1] = extra
+        return argv
+
+    return build
+
+
+_BUILDERS = {name: _compile(profile) for name, profile in EMULATOR_PROFILES.items()}
+
+
+@lru_cache(maxsize=64)
+def detect_emulator(console_name, emulator_path):
+    """Nombre del perfil para un ejecutable: por su nombre de archivo o, si no, por la consola."""
+    exe = os.path.basename(emulator_path or "").lower()
+    for name, profile in EMULATOR_PROFILES.items():
+        if any(fragment in exe for fragment in profile["match"]):
+            return name
+    return CONSOLE_EMULATORS.get(console_name, "generic")
+
+
+def supported_settings(console_name, emulator_path):
+    """Claves del perfil gráfico que el emulador de la consola traduce a flags."""
+    settings = EMULATOR_PROFILES[detect_emulator(console_name, emulator_path)].get("settings", {})
+    return tuple(key for key in PROFILE_KEYS if key in settings)
+
+
+def build_command(console_name, emulator_path, rom_path, graphics_profile=None):
+    """Línea de comando completa del juego con los flags de su perfil gráfico."""
+    builder = _BUILDERS[detect_emulator(console_name, emulator_path)]
+    return builder(emulator_path, rom_path, graphics_profile)
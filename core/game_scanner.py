@@ -1,8 +1,20 @@
 # core/game_scanner.py
 import os
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import re
+import threading
+from database.connection import get_connection
+from utils.cover_finder import CoverResolver, cover_dir
+
+# Cantidad de consolas que se recorren en paralelo (cada roms_path suele estar en un volumen distinto)
+SCAN_WORKERS = int(os.getenv("MULTIVERSE_SCAN_WORKERS", "4"))
+# Filas por lote al escribir en SQLite
+SCAN_BATCH_SIZE = 500
+# Un solo escritor de la tabla games a la vez: el escaneo completo y el watcher.
+# Se toma antes de recorrer las carpetas para que nadie aplique un listado viejo
+# sobre lo que el otro acaba de guardar.
+_write_lock = threading.Lock()
 
 def extract_base_name(filename: str) -> str:
     name = Path(filename).stem
@@ -10,86 +22,361 @@ def extract_base_name(filename: str) -> str:
     name = re.sub(r"\s*\[.*?\]", "", name)
     return name.strip() or filename
 
-def scan_games():
-    conn = sqlite3.connect("database/multiverse.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, name, roms_path FROM consoles")
-    consoles = cursor.fetchall()
+# Reglas de escaneo por consola. Agregar una consola = agregar una entrada aquí.
+#   depth:      0 = archivos en la raíz, 1 = una carpeta por juego, None = cualquier subcarpeta
+#   extensions: extensiones válidas, en orden de prioridad (en carpetas se usa la primera que aparezca)
+#   multiple:   extensiones de carpeta donde cada archivo es un juego (p. ej. varias listas .m3u)
+#   markers:    la carpeta es un juego si contiene alguna de estas entradas
+#   target:     "folder" (ruta = carpeta del juego) o "marker" (ruta = carpeta/marcador)
+#   title:      "stem" (nombre del archivo), "folder" (carpeta del juego) o "parent" (carpeta contenedora)
+CONSOLE_RULES = {
+    "PS1": {"depth": 1, "extensions": (".m3u", ".cue"), "multiple": (".m3u",), "title": "folder"},
+    "PS2": {"depth": 0, "extensions": (".iso",), "title": "stem"},
+    "PS3": {"depth": 1, "markers": ("PS3_GAME",), "target": "marker", "title": "folder"},
+    "Xbox 360": {"depth": None, "extensions": (".iso", ".xex"), "title": "parent"},
+    "Wii": {"depth": 0, "extensions": (".iso", ".wbfs", ".rvz"), "title": "stem"},
+    "WiiU": {"depth": 1, "markers": ("code",), "target": "folder", "title": "folder"},
+    "Switch": {"depth": 0, "extensions": (".nsp", ".xci"), "title": "stem"},
+    "NES": {"depth": 0, "extensions": (".nes",), "title": "stem"},
+}
 
-    for console_id, name, roms_path in consoles:
-        if not roms_path or not os.path.exists(roms_path):
-            cursor.execute("DELETE FROM games WHERE console_id = ?", (console_id,))
-            continue
+def _ext(name):
+    return os.path.splitext(name)[1].lower()
+
+def _game(entry, title):
+    """Arma la tupla del juego usando el stat cacheado del DirEntry (un solo stat por entrada)."""
+    st = entry.stat()
+    return (title, entry.path, st.st_size, int(st.st_mtime))
+
+def _scan_folder_game(rule, folder):
+    """
+    Evalúa una carpeta de juego (depth 1): marcadores o archivos por prioridad de extensión.
+    Se usa la extensión de mayor prioridad presente: todos sus archivos si está en
+    "multiple", o solo el primero por nombre.
+    """
+    markers = {m.lower() for m in rule.get("markers", ())}
+    extensions = rule.get("extensions", ())
+    best = []
+    best_rank = len(extensions)
+    try:
+        with os.scandir(folder.path) as it:
+            for entry in it:
+                name = entry.name.lower()
+                if name in markers:
+                    if rule.get("target") == "marker":
+                        return [_game(entry, folder.name)]
+                    return [_game(folder, folder.name)]
+                ext = _ext(name)
+                if ext in extensions and entry.is_file():
+                    rank = extensions.index(ext)
+                    if rank < best_rank:
+                        best, best_rank = [entry], rank
+                    elif rank == best_rank:
+                        best.append(entry)
+    except OSError:
+        return []
+    if not best:
+        return []
+    best.sort(key=lambda entry: entry.name)
+    if extensions[best_rank] not in rule.get("multiple", ()):
+        best = best[:1]
+    return [_game(entry, folder.name) for entry in best]
+
+def _scan_tree(rule, folder):
+    """Recorrido recursivo (depth None) sin seguir enlaces simbólicos, como rglob."""
+    games = []
+    parent_name = os.path.basename(folder)
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                try:
+                    games.extend(_scan_entry(rule, entry, parent_name))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return games
+
+def _scan_entry(rule, entry, parent_name):
+    """Aplica la regla de la consola a una entrada de la raíz y devuelve los juegos que contiene."""
+    depth = rule.get("depth", 0)
+    if depth == 1:
+        return _scan_folder_game(rule, entry) if entry.is_dir() else []
+    if depth is None and entry.is_dir(follow_symlinks=False):
+        return _scan_tree(rule, entry.path)
+    if _ext(entry.name) in rule.get("extensions", ()) and entry.is_file():
+        title = parent_name if rule.get("title") == "parent" else os.path.splitext(entry.name)[0]
+        return [_game(entry, title)]
+    return []
+
+def _known_covers(cursor, console_id, name):
+    """Carátulas ya resueltas de una consola: {carpeta: (mtime, carátula)}."""
+    is_dir = "markers" in CONSOLE_RULES.get(name, {})
+    # Juegos de una misma carpeta pueden tener un mtime viejo: gana el más reciente
+    cursor.execute(
+        "SELECT path, cover_path, cover_mtime FROM games WHERE console_id = ? AND cover_mtime IS NOT NULL "
+        "ORDER BY cover_mtime, id",
+        (console_id,)
+    )
+    return {
+        cover_dir(path, name, is_dir): (cover_mtime, cover_path)
+        for path, cover_path, cover_mtime in cursor.fetchall()
+    }
+
+def _attach_covers(name, found, known_covers=None):
+    """Agrega (carátula, mtime de su carpeta) a cada juego, con un listado por carpeta como mucho."""
+    resolver = CoverResolver(known_covers)
+    is_dir = "markers" in CONSOLE_RULES.get(name, {})
+    return [game + resolver.resolve(game[1], name, is_dir) for game in found]
+
+def _walk_console(name, roms_path, progress=None, cancel_event=None, known_covers=None):
+    """
+    Recorre la carpeta de una consola con os.scandir según CONSOLE_RULES y devuelve
+    (titulo, ruta, tamaño, mtime, carátula, mtime_carátula) por juego. Se ejecuta en
+    un hilo del pool; no toca la base de datos. Devuelve None si la carpeta está
+    configurada pero no es accesible o si el escaneo se canceló.
+    """
+    if not roms_path:
+        # Sin carpeta configurada → la consola no tiene juegos
+        return []
+    rule = CONSOLE_RULES.get(name)
+    if rule is None:
+        return []
+
+    # Normalizar como pathlib para que las rutas guardadas no cambien entre escaneos
+    root = str(Path(roms_path))
+    root_name = os.path.basename(root)
+    found = []
+    seen = set()
+    next_report = SCAN_BATCH_SIZE
+    if progress:
+        progress("console_started", name)
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                try:
+                    games = _scan_entry(rule, entry, root_name)
+                except OSError:
+                    continue
+                for game in games:
+                    if game[1] not in seen:
+                        seen.add(game[1])
+                        found.append(game)
+                if progress and len(found) >= next_report:
+                    progress("batch", name, len(found))
+                    next_report += SCAN_BATCH_SIZE
+    except OSError:
+        # Carpeta inaccesible (p. ej. NAS desconectado) → conservar la biblioteca
+        return None
+    return _attach_covers(name, found, known_covers)
+
+def _executemany_batched(cursor, sql, rows):
+    """Ejecuta sql por lotes y devuelve las filas afectadas."""
+    affected = 0
+    for start in range(0, len(rows), SCAN_BATCH_SIZE):
+        cursor.executemany(sql, rows[start:start + SCAN_BATCH_SIZE])
+        affected += max(cursor.rowcount, 0)
+    return affected
+
+def _in_scope(path, scope):
+    return any(path == prefix or path.startswith(prefix + os.sep) for prefix in scope)
+
+def _sync_console(cursor, console_id, found, scope=None):
+    """
+    Compara los juegos encontrados con los guardados (clave: ruta) y aplica solo
+    las diferencias. Los ids de los juegos existentes se conservan, por lo que
+    favoritos, perfiles gráficos y estadísticas siguen asociados.
+    Si se indica scope (lista de rutas), solo se comparan los juegos bajo esas rutas.
+
+    Un juego está "actualizado" solo si cambió su título, tamaño o mtime. La carátula
+    se guarda aparte: agregar una ROM cambia el mtime de la carpeta raíz, pero no por
+    eso se informan como cambiados los demás juegos de esa carpeta ("covers" cuenta
+    solo los que cambiaron de carátula; el mtime nuevo se guarda sin avisar).
+    """
+    cursor.execute(
+        "SELECT id, path, title, size, mtime, cover_path, cover_mtime FROM games WHERE console_id = ?",
+        (console_id,)
+    )
+    existing = {
+        path: (game_id, title, size, mtime, cover_path, cover_mtime)
+        for game_id, path, title, size, mtime, cover_path, cover_mtime in cursor.fetchall()
+        if scope is None or _in_scope(path, scope)
+    }
 
-        cursor.execute("DELETE FROM games WHERE console_id = ?", (console_id,))
-        games_to_add = []
-        roms_path_obj = Path(roms_path)
-
-        # === PS1: escanear subcarpetas, usar nombre de carpeta ===
-        if name == "PS1":
-            for item in roms_path_obj.iterdir():
-                if item.is_dir():
-                    # Buscar .m3u primero
-                    m3u_files = list(item.glob("*.m3u"))
-                    if m3u_files:
-                        for m3u in m3u_files:
-                            games_to_add.append((item.name, str(m3u), console_id, None, False))
+    to_insert = []
+    to_update = []
+    to_cover = []
+    to_cover_mtime = []
+    unchanged = 0
+    for title, path, size, mtime, cover_path, cover_mtime in found:
+        row = existing.pop(path, None)
+        if row is None:
+            to_insert.append((title, path, console_id, cover_path, False, size, mtime, cover_mtime))
+        elif row[1:4] != (title, size, mtime):
+            to_update.append((title, size, mtime, cover_path, cover_mtime, row[0]))
+        else:
+            unchanged += 1
+            if (row[4] or "") != cover_path:
+                to_cover.append((cover_path, cover_mtime, row[0]))
+            elif row[5] != cover_mtime:
+                # Misma carátula: solo se actualiza el mtime para no volver a listar la carpeta
+                to_cover_mtime.append((cover_path, cover_mtime, row[0]))
+
+    removed_ids = [(row[0],) for row in existing.values()]
+    # OR IGNORE: si la ruta ya se guardó (p. ej. entre la lectura y la escritura) no se duplica
+    inserted = _executemany_batched(
+        cursor,
+        "INSERT OR IGNORE INTO games (title, path, console_id, cover_path, is_favorite, size, mtime, cover_mtime) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        to_insert
+    )
+    _executemany_batched(
+        cursor,
+        "UPDATE games SET title = ?, size = ?, mtime = ?, cover_path = ?, cover_mtime = ? WHERE id = ?",
+        to_update
+    )
+    _executemany_batched(cursor, "UPDATE games SET cover_path = ?, cover_mtime = ? WHERE id = ?",
+                         to_cover + to_cover_mtime)
+    _executemany_batched(cursor, "DELETE FROM game_stats WHERE game_id = ?", removed_ids)
+    _executemany_batched(cursor, "DELETE FROM games WHERE id = ?", removed_ids)
+
+    return {
+        "added": inserted,
+        "removed": len(removed_ids),
+        "updated": len(to_update),
+        "unchanged": unchanged,
+        "covers": len(to_cover),
+        "added_paths": [row[1] for row in to_insert],
+        "removed_ids": [row[0] for row in removed_ids],
+        "updated_ids": [row[5] for row in to_update],
+        "cover_ids": [row[2] for row in to_cover]
+    }
+
+def sync_entries(console_id, names):
+    """
+    Sincroniza solo las entradas indicadas (nombres en la raíz de roms_path) de una
+    consola, sin recorrer el resto de la biblioteca. Lo usa el watcher de la
+    biblioteca para aplicar una copia o un borrado puntual.
+    Devuelve {"added": [ids], "removed": [ids], "updated": [ids], "covers": [ids]}
+    ("covers": juegos sin cambios cuya carátula cambió).
+    Si hay un escaneo completo en curso, espera a que termine.
+    """
+    with _write_lock:
+        return _sync_entries(console_id, names)
+
+def _sync_entries(console_id, names):
+    changes = {"added": [], "removed": [], "updated": [], "covers": []}
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT name, roms_path FROM consoles WHERE id = ?", (console_id,))
+        row = cursor.fetchone()
+        if not row or not row[1] or row[0] not in CONSOLE_RULES:
+            return changes
+        rule = CONSOLE_RULES[row[0]]
+        root = str(Path(row[1]))
+        root_name = os.path.basename(root)
+        names = set(names)
+
+        found = []
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.name in names:
+                    try:
+                        found.extend(_scan_entry(rule, entry, root_name))
+                    except OSError:
                         continue
-                    # Si no hay .m3u, buscar .cue
-                    cue_files = list(item.glob("*.cue"))
-                    if cue_files:
-                        games_to_add.append((item.name, str(cue_files[0]), console_id, None, False))
-
-        # === PS2: solo .iso en raíz ===
-        elif name == "PS2":
-            for file in roms_path_obj.iterdir():
-                if file.is_file() and file.suffix.lower() == ".iso":
-                    games_to_add.append((file.stem, str(file), console_id, None, False))
-
-        # === Wii: .iso, .wbfs, .rvz en raíz ===
-        elif name == "Wii":
-            for file in roms_path_obj.iterdir():
-                if file.is_file() and file.suffix.lower() in (".iso", ".wbfs", ".rvz"):
-                    games_to_add.append((file.stem, str(file), console_id, None, False))
-
-        # === WiiU: carpetas con /code ===
-        elif name == "WiiU":
-            for folder in roms_path_obj.iterdir():
-                if folder.is_dir() and (folder / "code").exists():
-                    games_to_add.append((folder.name, str(folder), console_id, None, False))
-
-        # === Switch: .nsp/.xci en raíz ===
-        elif name == "Switch":
-            for file in roms_path_obj.iterdir():
-                if file.is_file() and file.suffix.lower() in (".nsp", ".xci"):
-                    games_to_add.append((file.stem, str(file), console_id, None, False))
-
-        # === PS3: carpetas con /PS3_GAME ===
-        elif name == "PS3":
-            for folder in roms_path_obj.iterdir():
-                if folder.is_dir() and (folder / "PS3_GAME").exists():
-                    games_to_add.append((folder.name, str(folder / "PS3_GAME"), console_id, None, False))
-
-        # === Xbox 360 y NES: mantener como antes ===
-        elif name == "Xbox 360":
-            for ext in (".iso", ".xex"):
-                for file in roms_path_obj.rglob(f"*{ext}"):
-                    if file.is_file():
-                        games_to_add.append((file.parent.name, str(file), console_id, None, False))
-        elif name == "NES":
-            for file in roms_path_obj.iterdir():
-                if file.is_file() and file.suffix.lower() == ".nes":
-                    games_to_add.append((file.stem, str(file), console_id, None, False))
-
-        # Insertar
-        if games_to_add:
-            cursor.executemany(
-                "INSERT INTO games (title, path, console_id, cover_path, is_favorite) VALUES (?, ?, ?, ?, ?)",
-                games_to_add
+        found = _attach_covers(row[0], found, _known_covers(cursor, console_id, row[0]))
+        scope = [os.path.join(root, name) for name in names]
+        result = _sync_console(cursor, console_id, found, scope)
+        conn.commit()
+
+        if result["added_paths"]:
+            placeholders = ",".join("?" * len(result["added_paths"]))
+            cursor.execute(
+                f"SELECT id FROM games WHERE console_id = ? AND path IN ({placeholders})",
+                (console_id, *result["added_paths"])
             )
+            changes["added"] = [game_id for (game_id,) in cursor.fetchall()]
+        changes["removed"] = result["removed_ids"]
+        changes["updated"] = result["updated_ids"]
+        changes["covers"] = result["cover_ids"]
+    except OSError:
+        # Carpeta inaccesible: no tocar la biblioteca
+        conn.rollback()
+    except Exception:
+        conn.rollback()
+        raise
+    return changes
+
+def scan_games(max_workers=None, progress=None, cancel_event=None):
+    """
+    Escaneo incremental de la biblioteca. Solo inserta archivos nuevos, elimina los
+    que ya no existen y actualiza los modificados (tamaño/mtime), con una transacción
+    por consola. Devuelve el total de filas agregadas, eliminadas, actualizadas y sin
+    cambios, y si el escaneo fue cancelado.
+
+    Las carpetas de cada consola se recorren en paralelo (max_workers hilos, por
+    defecto SCAN_WORKERS) y un único escritor aplica los resultados en SQLite a
+    medida que cada consola termina, así el escaneo dura lo que el volumen más lento.
+
+    progress(evento, *datos) se llama desde los hilos del escaneo con:
+      - ("console_started", nombre)
+      - ("batch", nombre, juegos_encontrados) cada SCAN_BATCH_SIZE juegos
+      - ("console_finished", console_id, nombre, resultado) tras guardar la consola
+    Si cancel_event (threading.Event) se activa, se detiene después de la consola
+    en curso; las consolas ya guardadas se conservan.
+    Si el watcher está aplicando cambios, espera a que termine (y viceversa).
+    """
+    with _write_lock:
+        return _scan_games(max_workers, progress, cancel_event)
+
+def _scan_games(max_workers, progress, cancel_event):
+    totals = {"added": 0, "removed": 0, "updated": 0, "unchanged": 0}
+    cancelled = False
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT id, name, roms_path FROM consoles")
+        consoles = cursor.fetchall()
+
+        workers = max(1, min(max_workers or SCAN_WORKERS, len(consoles) or 1))
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+        try:
+            futures = {
+                pool.submit(
+                    _walk_console, name, roms_path, progress, cancel_event,
+                    _known_covers(cursor, console_id, name)
+                ): (console_id, name)
+                for console_id, name, roms_path in consoles
+            }
+            for future in as_completed(futures):
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                found = future.result()
+                if found is None:
+                    continue
+                console_id, name = futures[future]
+                result = _sync_console(cursor, console_id, found)
+                conn.commit()
+                for key in totals:
+                    totals[key] += result[key]
+                if progress:
+                    progress("console_finished", console_id, name, result)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    except Exception:
+        conn.rollback()
+        raise
+
+    print(f"🔄 Escaneo{' cancelado' if cancelled else ''}: {totals['added']} agregados, "
+          f"{totals['removed']} eliminados, {totals['updated']} actualizados, {totals['unchanged']} sin cambios.")
+    totals["cancelled"] = cancelled
+    return totals
 
-    conn.commit()
-    conn.close()
 def generate_m3u_for_ps1(roms_path: str):
     """Genera archivos .m3u DENTRO de cada carpeta de juego multidisco, usando el nombre de la carpeta."""
     if not os.path.exists(roms_path):
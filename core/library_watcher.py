@@ -0,0 +1,341 @@
+# core/library_watcher.py
+"""
+Vigila las carpetas de ROMs de cada consola y mantiene la tabla games al día
+sin reescanear toda la biblioteca.
+
+- En Linux usa inotify (vía ctypes, sin dependencias extra).
+- En otros sistemas, o si inotify no está disponible, compara el mtime de las
+  carpetas cada POLL_INTERVAL segundos.
+
+Los eventos se agrupan por consola y por entrada de la raíz de roms_path; cuando
+pasan DEBOUNCE_SECONDS sin eventos nuevos se llama a game_scanner.sync_entries
+solo con las entradas afectadas y se notifica on_change(console_id, changes).
+Si se pierden eventos se hace un escaneo incremental completo y se notifica
+on_change(None, None).
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from core.game_scanner import CONSOLE_RULES, scan_games, sync_entries
+from database.connection import get_connection, close_connection
+
+WATCHER_ENABLED = os.getenv("MULTIVERSE_WATCH_LIBRARY", "1") == "1"
+DEBOUNCE_SECONDS = 1.5
+POLL_INTERVAL = 5.0
+
+# Constantes de inotify (linux/inotify.h)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (_IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE |
+               _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    """Devuelve libc si expone inotify, o None para usar el modo polling."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class LibraryWatcher:
+    def __init__(self, on_change=None, debounce=DEBOUNCE_SECONDS, poll_interval=POLL_INTERVAL):
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._consoles = {}        # console_id -> (root, rule)
+        self._pending = {}         # console_id -> set(nombres en la raíz)
+        self._last_event = 0.0
+        self._full_rescan = False
+        # inotify
+        self._libc = None
+        self._fd = None
+        self._watches = {}         # wd -> (console_id, carpeta)
+        # polling
+        self._polled = set()       # consoles sin inotify
+        self._snapshots = {}       # console_id -> {carpeta: mtime}
+        self._listings = {}        # console_id -> set(nombres en la raíz)
+        self._unstable = {}        # (console_id, nombre) -> (tamaño, mtime) de entradas recién aplicadas
+        self._next_poll = 0.0
+
+    def start(self):
+        """Arranca el hilo; la lectura de consolas y el registro de carpetas corren en él."""
+        if self._thread and self._thread.is_alive() and not self._stop.is_set():
+            return
+        # Cada hilo tiene su propio evento; si el anterior sigue cerrándose, el nuevo lo espera
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop, self._thread),
+                                        name="library-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Avisa al hilo; él mismo libera el descriptor de inotify y el estado al salir."""
+        self._stop.set()
+
+    def restart(self):
+        """Recarga las rutas de las consolas (p. ej. después de guardar la configuración)."""
+        self.stop()
+        self.start()
+
+    # === Configuración ===
+
+    def _setup(self):
+        self._load_consoles()
+        self._libc = _load_inotify()
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            self._fd = fd if fd >= 0 else None
+        self.backend = "inotify" if self._fd is not None else "polling"
+        for console_id in self._consoles:
+            if self._fd is None or not self._watch_console(console_id):
+                self._polled.add(console_id)
+                self._take_snapshot(console_id)
+        self._next_poll = time.monotonic() + self.poll_interval
+        print(f"👀 Vigilando la biblioteca ({self.backend}, {len(self._consoles)} consolas).")
+
+    def _release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = None
+        self._watches.clear()
+        self._polled.clear()
+        self._snapshots.clear()
+        self._listings.clear()
+        self._unstable.clear()
+        with self._lock:
+            self._pending.clear()
+            self._full_rescan = False
+
+    def _load_consoles(self):
+        cursor = get_connection().cursor()
+        cursor.execute("SELECT id, name, roms_path FROM consoles")
+        rows = cursor.fetchall()
+        self._consoles = {}
+        for console_id, name, roms_path in rows:
+            rule = CONSOLE_RULES.get(name)
+            if rule and roms_path and os.path.isdir(roms_path):
+                self._consoles[console_id] = (str(Path(roms_path)), rule)
+
+    def _watched_dirs(self, console_id):
+        """Carpetas que hay que vigilar según la profundidad de la regla."""
+        root, rule = self._consoles[console_id]
+        depth = rule.get("depth", 0)
+        dirs = [root]
+        if depth == 0:
+            return dirs
+        try:
+            with os.scandir(root) as it:
+                subdirs = [entry.path for entry in it if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return dirs
+        if depth == 1:
+            return dirs + subdirs
+        for subdir in subdirs:
+            for current, children, _ in os.walk(subdir):
+                dirs.append(current)
+        return dirs
+
+    def _top_name(self, console_id, path):
+        """Nombre de la entrada de la raíz que contiene path, o None si path es la raíz."""
+        root = self._consoles[console_id][0]
+        rel = os.path.relpath(path, root)
+        if rel == "." or rel.startswith(".."):
+            return None
+        return rel.split(os.sep, 1)[0]
+
+    def _mark(self, console_id, name):
+        with self._lock:
+            self._pending.setdefault(console_id, set()).add(name)
+            self._last_event = time.monotonic()
+
+    # === inotify ===
+
+    def _add_watch(self, console_id, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            return False
+        self._watches[wd] = (console_id, path)
+        return True
+
+    def _watch_console(self, console_id):
+        """Registra las carpetas de la consola en inotify. Devuelve False si no alcanzan los watches."""
+        for path in self._watched_dirs(console_id):
+            if not self._add_watch(console_id, path):
+                print(f"⚠️ inotify sin watches disponibles para {path}; se usará polling.")
+                for wd in [wd for wd, (cid, _) in self._watches.items() if cid == console_id]:
+                    self._watches.pop(wd)
+                return False
+        return True
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                self._full_rescan = True
+                self._last_event = time.monotonic()
+                continue
+            if mask & _IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            if wd not in self._watches:
+                continue
+            console_id, folder = self._watches[wd]
+            path = os.path.join(folder, name) if name else folder
+            top = self._top_name(console_id, path)
+            if top is None:
+                continue
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                self._watch_new_dir(console_id, path)
+            self._mark(console_id, top)
+
+    def _watch_new_dir(self, console_id, path):
+        """Agrega watches a carpetas nuevas dentro de la profundidad de la regla."""
+        rule = self._consoles[console_id][1]
+        depth = rule.get("depth", 0)
+        if depth == 0:
+            return
+        if depth == 1:
+            if os.path.dirname(path) == self._consoles[console_id][0]:
+                self._add_watch(console_id, path)
+            return
+        for current, _, _ in os.walk(path):
+            self._add_watch(console_id, current)
+
+    # === Polling ===
+
+    def _take_snapshot(self, console_id):
+        snapshot = {}
+        for path in self._watched_dirs(console_id):
+            try:
+                snapshot[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+        self._snapshots[console_id] = snapshot
+        root = self._consoles[console_id][0]
+        try:
+            self._listings[console_id] = set(os.listdir(root))
+        except OSError:
+            self._listings[console_id] = set()
+
+    def _entry_signature(self, console_id, name):
+        try:
+            st = os.stat(os.path.join(self._consoles[console_id][0], name))
+            return (st.st_size, st.st_mtime_ns)
+        except OSError:
+            return None
+
+    def _poll(self):
+        # Un archivo que se sigue copiando no cambia el mtime de la carpeta:
+        # las entradas recién aplicadas se revisan hasta que su tamaño se estabiliza.
+        for key, signature in list(self._unstable.items()):
+            current = self._entry_signature(*key)
+            if current != signature:
+                self._mark(*key)
+            del self._unstable[key]
+
+        for console_id in list(self._polled):
+            root = self._consoles[console_id][0]
+            old_snapshot = self._snapshots.get(console_id, {})
+            old_listing = self._listings.get(console_id, set())
+            self._take_snapshot(console_id)
+            new_snapshot = self._snapshots[console_id]
+            changed = {path for path in set(old_snapshot) | set(new_snapshot)
+                       if old_snapshot.get(path) != new_snapshot.get(path)}
+            for path in changed:
+                if path == root:
+                    # Altas y bajas en la raíz: comparar el listado
+                    for name in old_listing ^ self._listings[console_id]:
+                        self._mark(console_id, name)
+                else:
+                    top = self._top_name(console_id, path)
+                    if top:
+                        self._mark(console_id, top)
+
+    # === Bucle principal ===
+
+    def _run(self, stop, previous):
+        if previous is not None:
+            previous.join()
+        if stop.is_set():
+            return
+        try:
+            self._setup()
+            self._loop(stop)
+        finally:
+            self._release()
+            close_connection()
+
+    def _loop(self, stop):
+        while not stop.is_set():
+            now = time.monotonic()
+            timeout = min(0.5, max(0.0, self._next_poll - now)) if self._polled else 0.5
+            if self._fd is not None:
+                try:
+                    readable, _, _ = select.select([self._fd], [], [], timeout)
+                except (OSError, ValueError):
+                    break
+                if readable:
+                    self._read_events()
+            else:
+                stop.wait(timeout)
+
+            now = time.monotonic()
+            if self._polled and now >= self._next_poll:
+                self._poll()
+                self._next_poll = now + self.poll_interval
+            if now - self._last_event >= self.debounce:
+                self._flush()
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            full_rescan, self._full_rescan = self._full_rescan, False
+        try:
+            if full_rescan:
+                # Se perdieron eventos: un escaneo incremental completo recupera el estado
+                scan_games()
+                if self.on_change:
+                    self.on_change(None, None)
+                return
+            for console_id, names in pending.items():
+                changes = sync_entries(console_id, names)
+                if console_id in self._polled:
+                    for name in names:
+                        self._unstable[(console_id, name)] = self._entry_signature(console_id, name)
+                if any(changes.values()) and self.on_change:
+                    self.on_change(console_id, changes)
+        except Exception as e:
+            print(f"❌ Error al actualizar la biblioteca: {e}")
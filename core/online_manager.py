@@ -109,20 +109,55 @@ def get_user_role(token: str) -> str:
         print(f"Error al decodificar token: {e}")
         return "user"
 
-def get_all_users(token: str) -> list:
-    """Obtiene la lista de todos los usuarios (solo para admins)."""
+def get_users_page(token: str, cursor: str = None, limit: int = 100, sort: str = "created_at",
+                   order: str = "desc", email: str = None, fields: str = "email,created_at,is_admin") -> dict:
+    """
+    Obtiene una página de usuarios (solo para admins).
+    Devuelve {"items": [...], "next_cursor": str | None}; next_cursor pide la página siguiente.
+    """
+    params = {"limit": limit, "sort": sort, "order": order, "fields": fields}
+    if cursor:
+        params["cursor"] = cursor
+    if email:
+        params["email"] = email
     try:
         response = requests.get(
             f"{SERVER_URL}/admin/users",
             headers={"Authorization": f"Bearer {token}"},
+            params=params,
             timeout=10
         )
         if response.status_code == 200:
             return response.json()
-        return []
+        print(f"Error al obtener usuarios: {response.status_code} - {response.text}")
     except Exception as e:
         print(f"Excepción al obtener usuarios: {e}")
-        return []
+    return {"items": [], "next_cursor": None}
+
+def export_users(token: str, path: str, email: str = None, fields: str = "email,created_at,is_admin") -> int:
+    """Descarga todos los usuarios en NDJSON directo a un archivo, sin cargarlos en memoria."""
+    params = {"format": "ndjson", "fields": fields}
+    if email:
+        params["email"] = email
+    count = 0
+    try:
+        with requests.get(
+            f"{SERVER_URL}/admin/users",
+            headers={"Authorization": f"Bearer {token}"},
+            params=params,
+            stream=True,
+            timeout=30
+        ) as response:
+            response.raise_for_status()
+            with open(path, "w", encoding="utf-8") as f:
+                for line in response.iter_lines():
+                    if line:
+                        f.write(line.decode("utf-8") + "\n")
+                        count += 1
+        print(f"✅ {count} usuarios exportados a {path}")
+    except Exception as e:
+        print(f"❌ Error al exportar usuarios: {e}")
+    return count
 
 def save_refresh_token(token: str):
     """Guarda el refresh token en un archivo local cifrado."""
@@ -0,0 +1,160 @@
+# core/process_policy.py
+"""
+Políticas de planificación para los emuladores y para el propio launcher.
+
+Al lanzar un juego se aplica la política de su consola (PROCESS_POLICIES), con lo
+que el juego sobrescriba en graphics_profile["process"]:
+  - priority: "low" | "normal" | "high"
+  - affinity: "all" | "exclude_first" (deja el primer núcleo al sistema y al launcher) | [núcleos]
+  - io:       "low" | "normal" | "high"
+
+Mientras haya partidas abiertas, LauncherThrottle baja la prioridad de E/S del
+launcher y lo fija a los núcleos que el emulador no usa.
+Los cambios que el sistema no permite (p. ej. subir la prioridad sin privilegios
+en Linux) se informan y se ignoran.
+"""
+
+import os
+import psutil
+
+LAUNCHER_THROTTLE_ENABLED = os.getenv("MULTIVERSE_THROTTLE_LAUNCHER", "1") == "1"
+
+DEFAULT_POLICY = {"priority": "normal", "affinity": "all", "io": "normal"}
+
+# Consolas con emuladores limitados por CPU: más prioridad y el primer núcleo libre para el resto
+PROCESS_POLICIES = {
+    "PS3": {"priority": "high", "affinity": "exclude_first"},
+    "Xbox 360": {"priority": "high", "affinity": "exclude_first"},
+    "WiiU": {"priority": "high", "affinity": "exclude_first"},
+    "Switch": {"priority": "high", "affinity": "exclude_first"},
+}
+
+_IS_WINDOWS = os.name == "nt"
+
+if _IS_WINDOWS:
+    PRIORITY_LEVELS = {
+        "low": psutil.BELOW_NORMAL_PRIORITY_CLASS,
+        "normal": psutil.NORMAL_PRIORITY_CLASS,
+        "high": psutil.HIGH_PRIORITY_CLASS,
+    }
+    IO_LEVELS = {
+        "low": (psutil.IOPRIO_LOW,),
+        "normal": (psutil.IOPRIO_NORMAL,),
+        "high": (psutil.IOPRIO_HIGH,),
+    }
+else:
+    # Valores de nice; bajar de 0 requiere privilegios
+    PRIORITY_LEVELS = {"low": 10, "normal": 0, "high": -5}
+    IO_LEVELS = {
+        "low": (getattr(psutil, "IOPRIO_CLASS_BE", 2), 7),
+        "normal": (getattr(psutil, "IOPRIO_CLASS_BE", 2), 4),
+        "high": (getattr(psutil, "IOPRIO_CLASS_BE", 2), 0),
+    }
+
+
+def resolve_policy(console_name, graphics_profile=None):
+    """Política final del juego: valores por defecto, luego la consola y luego el juego."""
+    policy = dict(DEFAULT_POLICY)
+    policy.update(PROCESS_POLICIES.get(console_name, {}))
+    if graphics_profile and isinstance(graphics_profile.get("process"), dict):
+        policy.update(graphics_profile["process"])
+    return policy
+
+
+def _affinity_cores(affinity):
+    cores = list(range(psutil.cpu_count() or 1))
+    if affinity == "exclude_first" and len(cores) > 2:
+        return cores[1:]
+    if isinstance(affinity, (list, tuple)):
+        return [core for core in affinity if core in cores] or cores
+    return cores
+
+
+def _set(process, description, action):
+    try:
+        action()
+    except (psutil.Error, OSError, ValueError) as e:
+        print(f"⚠️ No se pudo aplicar {description} al proceso {process.pid}: {e}")
+
+
+def _current_io(process):
+    io = process.ionice()
+    return (io,) if _IS_WINDOWS else (io.ioclass, io.value)
+
+
+def _ensure(process, description, current, target, setter):
+    """Fija el valor solo si es distinto del actual (evita pedir privilegios sin necesidad)."""
+    def action():
+        if current() != target:
+            setter(target)
+    _set(process, description, action)
+
+
+def apply_policy(pid, policy):
+    """
+    Aplica prioridad, afinidad y prioridad de E/S al proceso del emulador.
+    Se fijan siempre, también los valores por defecto: el emulador hereda los del
+    launcher, que pueden estar reducidos por LauncherThrottle si ya hay otra partida.
+    """
+    try:
+        process = psutil.Process(pid)
+    except psutil.Error:
+        return
+    priority = PRIORITY_LEVELS.get(policy.get("priority"), PRIORITY_LEVELS["normal"])
+    _ensure(process, "la prioridad", process.nice, priority, process.nice)
+    if hasattr(process, "cpu_affinity"):
+        cores = _affinity_cores(policy.get("affinity", "all"))
+        _ensure(process, "la afinidad", lambda: sorted(process.cpu_affinity()), cores, process.cpu_affinity)
+    if hasattr(process, "ionice"):
+        io = IO_LEVELS.get(policy.get("io"), IO_LEVELS["normal"])
+        _ensure(process, "la prioridad de E/S", lambda: _current_io(process), io, lambda value: process.ionice(*value))
+
+
+class LauncherThrottle:
+    """
+    Listener del SessionTracker: al empezar la primera partida cede CPU y disco del
+    launcher al emulador y los devuelve cuando termina la última.
+    """
+
+    def __init__(self, session_tracker):
+        self.tracker = session_tracker
+        self.process = psutil.Process()
+        self._saved = None
+
+    def __call__(self, event, session):
+        if event == "started" and self._saved is None:
+            self.throttle()
+        elif event == "ended" and self._saved is not None and not self.tracker.running_sessions():
+            self.restore()
+
+    def throttle(self):
+        saved = {}
+        if hasattr(self.process, "cpu_affinity"):
+            saved["affinity"] = self.process.cpu_affinity()
+            cores = list(range(psutil.cpu_count() or 1))
+            reserved = [core for core in cores if core not in _affinity_cores("exclude_first")]
+            if reserved:
+                _set(self.process, "la afinidad", lambda: self.process.cpu_affinity(reserved))
+        if hasattr(self.process, "ionice"):
+            saved["io"] = self.process.ionice()
+            _set(self.process, "la prioridad de E/S", lambda: self.process.ionice(*IO_LEVELS["low"]))
+        if _IS_WINDOWS:
+            # En Windows la prioridad se puede restaurar sin privilegios (con nice de POSIX no)
+            saved["priority"] = self.process.nice()
+            _set(self.process, "la prioridad", lambda: self.process.nice(PRIORITY_LEVELS["low"]))
+        self._saved = saved
+
+    def restore(self):
+        saved, self._saved = self._saved, None
+        if "affinity" in saved:
+            _set(self.process, "la afinidad", lambda: self.process.cpu_affinity(saved["affinity"]))
+        if "io" in saved:
+            io = saved["io"]
+            args = (io,) if _IS_WINDOWS else (io.ioclass, io.value)
+            _set(self.process, "la prioridad de E/S", lambda: self.process.ionice(*args))
+        if "priority" in saved:
+            _set(self.process, "la prioridad", lambda: self.process.nice(saved["priority"]))
+
+    @property
+    def active(self):
+        return self._saved is not None
@@ -0,0 +1,131 @@
+# core/resource_monitor.py
+"""
+Muestreo de recursos del emulador durante una partida.
+
+Un ResourceSampler por sesión lee con psutil el proceso del emulador (y sus hijos)
+cada SAMPLE_INTERVAL segundos y guarda las últimas muestras en un buffer circular.
+Al terminar la sesión se resume (promedios, picos y bytes leídos/escritos) y el
+resumen se guarda junto a la sesión en play_sessions.
+
+El CPU se expresa como porcentaje de la máquina completa (100 = todos los núcleos).
+Los FPS / tiempo de frame no se pueden medir desde fuera del emulador.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+import psutil
+
+RESOURCE_MONITOR_ENABLED = os.getenv("MULTIVERSE_RESOURCE_MONITOR", "1") == "1"
+SAMPLE_INTERVAL = float(os.getenv("MULTIVERSE_SAMPLE_INTERVAL", "2.0"))
+# Muestras que se conservan en memoria por sesión
+SAMPLE_HISTORY = 300
+
+CPU_COUNT = psutil.cpu_count() or 1
+
+
+class ResourceSampler:
+    def __init__(self, pid, interval=SAMPLE_INTERVAL, history=SAMPLE_HISTORY):
+        self.pid = pid
+        self.interval = interval
+        self.samples = deque(maxlen=history)
+        self._procs = {}
+        self._io_last = {}
+        self._count = 0
+        self._cpu_total = 0.0
+        self._rss_total = 0
+        self._max_cpu = 0.0
+        self._max_rss = 0
+        self._read_bytes = 0
+        self._write_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"sampler-{pid}")
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el muestreo y devuelve el resumen de la sesión."""
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(self.interval + 1)
+        return self.summary()
+
+    def latest(self):
+        return self.samples[-1] if self.samples else None
+
+    def summary(self):
+        if not self._count:
+            return None
+        return {
+            "samples": self._count,
+            "avg_cpu": round(self._cpu_total / self._count, 1),
+            "max_cpu": round(self._max_cpu, 1),
+            "avg_rss": self._rss_total // self._count,
+            "max_rss": self._max_rss,
+            "read_bytes": self._read_bytes,
+            "write_bytes": self._write_bytes,
+        }
+
+    def _run(self):
+        try:
+            root = psutil.Process(self.pid)
+        except psutil.Error:
+            return
+        self._procs[self.pid] = root
+        root.cpu_percent(None)  # la primera lectura solo fija la referencia
+        while not self._stop.wait(self.interval):
+            if not self._sample(root):
+                break
+
+    def _processes(self, root):
+        """El emulador y sus hijos, reutilizando los objetos Process para que cpu_percent sea incremental."""
+        try:
+            children = root.children(recursive=True)
+        except psutil.Error:
+            return []
+        current = {self.pid: root}
+        for child in children:
+            current[child.pid] = self._procs.get(child.pid, child)
+        self._procs = current
+        return list(current.values())
+
+    def _sample(self, root):
+        if not root.is_running():
+            return False
+        cpu = 0.0
+        rss = 0
+        read_rate = write_rate = 0.0
+        for proc in self._processes(root):
+            try:
+                with proc.oneshot():
+                    cpu += proc.cpu_percent(None)
+                    rss += proc.memory_info().rss
+                    io = proc.io_counters() if hasattr(proc, "io_counters") else None
+            except psutil.Error:
+                continue
+            if io is not None:
+                last = self._io_last.get(proc.pid)
+                self._io_last[proc.pid] = (io.read_bytes, io.write_bytes)
+                if last is not None:
+                    read = max(0, io.read_bytes - last[0])
+                    write = max(0, io.write_bytes - last[1])
+                    self._read_bytes += read
+                    self._write_bytes += write
+                    read_rate += read / self.interval
+                    write_rate += write / self.interval
+        cpu /= CPU_COUNT
+        self.samples.append({
+            "time": time.time(),
+            "cpu": cpu,
+            "rss": rss,
+            "read_rate": read_rate,
+            "write_rate": write_rate,
+        })
+        self._count += 1
+        self._cpu_total += cpu
+        self._rss_total += rss
+        self._max_cpu = max(self._max_cpu, cpu)
+        self._max_rss = max(self._max_rss, rss)
+        return True
@@ -0,0 +1,149 @@
+# core/stats_manager.py
+"""
+Historial de partidas y estadísticas agregadas.
+
+Cada sesión cerrada se agrega a play_sessions (solo inserciones) y, en la misma
+transacción, suma su tiempo a los acumulados por juego (game_stats), día, semana
+ISO y consola. La pantalla de estadísticas lee solo esos acumulados, así que su
+costo no crece con los años de historial.
+"""
+
+from datetime import datetime
+from database.connection import get_connection
+
+def record_session(session):
+    """Guarda una GameSession terminada y actualiza los acumulados."""
+    started = datetime.fromtimestamp(session.started_at)
+    ended = datetime.fromtimestamp(session.ended_at)
+    duration = session.duration
+    day = started.strftime("%Y-%m-%d")
+    week = started.strftime("%G-W%V")
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT console_id, graphics_profile FROM games WHERE id = ?", (session.game_id,))
+        row = cursor.fetchone()
+        console_id, graphics_profile = row if row else (None, None)
+        resources = getattr(session, "resources", None) or {}
+
+        cursor.execute("""
+            INSERT INTO play_sessions (game_id, console_id, started_at, ended_at, duration, exit_code,
+                                       graphics_profile, avg_cpu, max_cpu, avg_rss, max_rss,
+                                       read_bytes, write_bytes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (session.game_id, console_id, int(session.started_at), int(session.ended_at),
+              duration, session.exit_code, graphics_profile,
+              resources.get("avg_cpu"), resources.get("max_cpu"), resources.get("avg_rss"),
+              resources.get("max_rss"), resources.get("read_bytes"), resources.get("write_bytes")))
+        cursor.execute("""
+            INSERT INTO game_stats (game_id, play_count, total_time, last_played)
+            VALUES (?, 1, ?, ?)
+            ON CONFLICT(game_id) DO UPDATE SET
+                play_count = play_count + 1,
+                total_time = total_time + excluded.total_time,
+                last_played = excluded.last_played
+        """, (session.game_id, duration, ended))
+        if resources:
+            # Promedio móvil del CPU y picos de CPU/RAM del juego
+            cursor.execute("""
+                UPDATE game_stats SET
+                    avg_cpu = (COALESCE(avg_cpu, 0) * profiled_sessions + ?) / (profiled_sessions + 1),
+                    peak_cpu = MAX(COALESCE(peak_cpu, 0), ?),
+                    peak_rss = MAX(COALESCE(peak_rss, 0), ?),
+                    profiled_sessions = profiled_sessions + 1
+                WHERE game_id = ?
+            """, (resources["avg_cpu"], resources["max_cpu"], resources["max_rss"], session.game_id))
+        cursor.execute("""
+            INSERT INTO stats_daily (day, sessions, total_time) VALUES (?, 1, ?)
+            ON CONFLICT(day) DO UPDATE SET
+                sessions = sessions + 1,
+                total_time = total_time + excluded.total_time
+        """, (day, duration))
+        cursor.execute("""
+            INSERT INTO stats_weekly (week, sessions, total_time) VALUES (?, 1, ?)
+            ON CONFLICT(week) DO UPDATE SET
+                sessions = sessions + 1,
+                total_time = total_time + excluded.total_time
+        """, (week, duration))
+        if console_id is not None:
+            cursor.execute("""
+                INSERT INTO stats_console (console_id, sessions, total_time, last_played)
+                VALUES (?, 1, ?, ?)
+                ON CONFLICT(console_id) DO UPDATE SET
+                    sessions = sessions + 1,
+                    total_time = total_time + excluded.total_time,
+                    last_played = excluded.last_played
+            """, (console_id, duration, ended))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def top_games(limit=10):
+    """[(título, veces jugado, segundos)] ordenado por tiempo total."""
+    cursor = get_connection().cursor()
+    cursor.execute("""
+        SELECT g.title, s.play_count, s.total_time
+        FROM game_stats s
+        JOIN games g ON s.game_id = g.id
+        ORDER BY s.total_time DESC
+        LIMIT ?
+    """, (limit,))
+    return cursor.fetchall()
+
+def heaviest_games(limit=10):
+    """[(título, sesiones medidas, CPU promedio %, CPU pico %, RAM pico en bytes)] por CPU promedio."""
+    cursor = get_connection().cursor()
+    cursor.execute("""
+        SELECT g.title, s.profiled_sessions, s.avg_cpu, s.peak_cpu, s.peak_rss
+        FROM game_stats s
+        JOIN games g ON s.game_id = g.id
+        WHERE s.profiled_sessions > 0
+        ORDER BY s.avg_cpu DESC
+        LIMIT ?
+    """, (limit,))
+    return cursor.fetchall()
+
+def console_totals():
+    """[(consola, sesiones, segundos)] ordenado por tiempo total."""
+    cursor = get_connection().cursor()
+    cursor.execute("""
+        SELECT c.name, s.sessions, s.total_time
+        FROM stats_console s
+        JOIN consoles c ON s.console_id = c.id
+        ORDER BY s.total_time DESC
+    """)
+    return cursor.fetchall()
+
+def daily_totals(days=30):
+    """[(día, sesiones, segundos)] de los últimos días con partidas, del más antiguo al más reciente."""
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT day, sessions, total_time FROM stats_daily ORDER BY day DESC LIMIT ?", (days,))
+    return cursor.fetchall()[::-1]
+
+def weekly_totals(weeks=12):
+    """[(semana ISO, sesiones, segundos)] de las últimas semanas con partidas, en orden cronológico."""
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT week, sessions, total_time FROM stats_weekly ORDER BY week DESC LIMIT ?", (weeks,))
+    return cursor.fetchall()[::-1]
+
+def recent_sessions(game_id=None, limit=50):
+    """
+    Últimas sesiones, opcionalmente de un juego: (game_id, inicio, fin, duración, código de salida,
+    perfil gráfico, CPU promedio %, CPU pico %, RAM pico). Sirve para comparar perfiles gráficos.
+    """
+    cursor = get_connection().cursor()
+    if game_id is None:
+        cursor.execute("""
+            SELECT game_id, started_at, ended_at, duration, exit_code,
+                   graphics_profile, avg_cpu, max_cpu, max_rss
+            FROM play_sessions ORDER BY started_at DESC LIMIT ?
+        """, (limit,))
+    else:
+        cursor.execute("""
+            SELECT game_id, started_at, ended_at, duration, exit_code,
+                   graphics_profile, avg_cpu, max_cpu, max_rss
+            FROM play_sessions WHERE game_id = ? ORDER BY started_at DESC LIMIT ?
+        """, (game_id, limit))
+    return cursor.fetchall()
@@ -0,0 +1,39 @@
+# database/connection.py
+"""
+Conexión compartida a la base de datos local del launcher.
+
+Cada hilo reutiliza una única conexión de larga vida (la UI, el monitor de
+partidas, el watcher y el escaneo tienen la suya). La base usa WAL para que las
+escrituras de estadísticas desde otros hilos no bloqueen las lecturas de la UI.
+"""
+
+import os
+import sqlite3
+import threading
+
+DB_PATH = os.getenv("MULTIVERSE_DB_PATH", os.path.join("database", "multiverse.db"))
+# Caché de páginas por conexión, en KiB
+CACHE_SIZE_KB = 16 * 1024
+# Segundos que espera una escritura si otra conexión tiene el lock
+BUSY_TIMEOUT = 30
+
+_local = threading.local()
+
+def get_connection() -> sqlite3.Connection:
+    """Devuelve la conexión del hilo actual, creándola y configurándola la primera vez."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        _local.conn = conn
+    return conn
+
+def close_connection():
+    """Cierra la conexión del hilo actual (para hilos de corta duración)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
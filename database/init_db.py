@@ -1,12 +1,9 @@
 # database/init_db.py
-import sqlite3
-import os
-
-DB_PATH = "database/multiverse.db"
+from database.connection import get_connection
+from database.migrations import migrate
 
 def init_database():
-    os.makedirs("database", exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
 
     # Tablas existentes
@@ -55,7 +52,12 @@ def init_database():
         )
     """)
 
-    # Datos iniciales de consolas
+    conn.commit()
+
+    # Índices y cambios de esquema posteriores (también actualiza bases existentes)
+    migrate(conn)
+
+    # Datos iniciales de consolas (UNIQUE(name) evita duplicados)
     consoles = [
         ("PS1", "", ""),
         ("PS2", "", ""),
@@ -72,7 +74,6 @@ def init_database():
     )
 
     conn.commit()
-    conn.close()
 
 if __name__ == "__main__":
     init_database()
\ No newline at end of file
@@ -0,0 +1,169 @@
+# database/migrations.py
+"""
+Migraciones de la base local del launcher, versionadas con PRAGMA user_version.
+
+Cada función de MIGRATIONS lleva la base de la versión N a la N+1 y se ejecuta
+una sola vez, dentro de su propia transacción. Para cambiar el esquema se agrega
+una función nueva al final de la lista; nunca se modifican las existentes.
+"""
+
+def _column_names(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+def _add_scan_columns(cursor):
+    """v1: tamaño y mtime de cada juego para el escaneo incremental."""
+    columns = _column_names(cursor, "games")
+    if "size" not in columns:
+        cursor.execute("ALTER TABLE games ADD COLUMN size INTEGER")
+    if "mtime" not in columns:
+        cursor.execute("ALTER TABLE games ADD COLUMN mtime INTEGER")
+
+def _unique_console_names(cursor):
+    """v2: elimina consolas duplicadas por INSERT OR IGNORE y agrega UNIQUE(name)."""
+    cursor.execute("""
+        SELECT name, MIN(id) FROM consoles
+        GROUP BY name HAVING COUNT(*) > 1
+    """)
+    for name, keep_id in cursor.fetchall():
+        # Conservar las rutas configuradas en cualquiera de los duplicados
+        cursor.execute("""
+            UPDATE consoles SET
+                roms_path = COALESCE(NULLIF(roms_path, ''), (
+                    SELECT roms_path FROM consoles d
+                    WHERE d.name = ? AND d.id != ? AND COALESCE(d.roms_path, '') != ''
+                    ORDER BY d.id LIMIT 1), roms_path),
+                emulator_path = COALESCE(NULLIF(emulator_path, ''), (
+                    SELECT emulator_path FROM consoles d
+                    WHERE d.name = ? AND d.id != ? AND COALESCE(d.emulator_path, '') != ''
+                    ORDER BY d.id LIMIT 1), emulator_path)
+            WHERE id = ?
+        """, (name, keep_id, name, keep_id, keep_id))
+        cursor.execute("""
+            UPDATE games SET console_id = ?
+            WHERE console_id IN (SELECT id FROM consoles WHERE name = ? AND id != ?)
+        """, (keep_id, name, keep_id))
+        cursor.execute("DELETE FROM consoles WHERE name = ? AND id != ?", (name, keep_id))
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_consoles_name ON consoles(name)")
+
+def _games_indexes(cursor):
+    """v3: índices para los filtros de la grilla y clave única por ruta."""
+    cursor.execute("""
+        SELECT path, MIN(id), MAX(is_favorite) FROM games
+        WHERE path IS NOT NULL
+        GROUP BY path HAVING COUNT(*) > 1
+    """)
+    for path, keep_id, is_favorite in cursor.fetchall():
+        cursor.execute("UPDATE games SET is_favorite = ? WHERE id = ?", (is_favorite, keep_id))
+        cursor.execute("""
+            DELETE FROM game_stats
+            WHERE game_id IN (SELECT id FROM games WHERE path = ? AND id != ?)
+        """, (path, keep_id))
+        cursor.execute("DELETE FROM games WHERE path = ? AND id != ?", (path, keep_id))
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_games_path ON games(path)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_console ON games(console_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_favorite ON games(is_favorite)")
+
+def _cover_cache_columns(cursor):
+    """v4: mtime de la carpeta de la carátula, para resolverla de nuevo solo si la carpeta cambia."""
+    if "cover_mtime" not in _column_names(cursor, "games"):
+        cursor.execute("ALTER TABLE games ADD COLUMN cover_mtime INTEGER")
+
+def _play_history_tables(cursor):
+    """v5: historial de sesiones y acumulados por día, semana y consola para las estadísticas."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS play_sessions (
+            id INTEGER PRIMARY KEY,
+            game_id INTEGER NOT NULL,
+            console_id INTEGER,
+            started_at INTEGER NOT NULL,
+            ended_at INTEGER NOT NULL,
+            duration INTEGER NOT NULL,
+            exit_code INTEGER
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_play_sessions_game ON play_sessions(game_id, started_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_play_sessions_started ON play_sessions(started_at)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_daily (
+            day TEXT PRIMARY KEY,
+            sessions INTEGER DEFAULT 0,
+            total_time INTEGER DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_weekly (
+            week TEXT PRIMARY KEY,
+            sessions INTEGER DEFAULT 0,
+            total_time INTEGER DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_console (
+            console_id INTEGER PRIMARY KEY,
+            sessions INTEGER DEFAULT 0,
+            total_time INTEGER DEFAULT 0,
+            last_played TIMESTAMP
+        )
+    """)
+    # Los acumulados por consola se pueden reconstruir desde game_stats; día y semana empiezan vacíos
+    cursor.execute("""
+        INSERT OR IGNORE INTO stats_console (console_id, sessions, total_time, last_played)
+        SELECT g.console_id, SUM(s.play_count), SUM(s.total_time), MAX(s.last_played)
+        FROM game_stats s
+        JOIN games g ON s.game_id = g.id
+        GROUP BY g.console_id
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_game_stats_total_time ON game_stats(total_time DESC)")
+
+def _session_resource_columns(cursor):
+    """v6: resumen de CPU/RAM/IO por sesión y acumulados de rendimiento por juego."""
+    session_columns = _column_names(cursor, "play_sessions")
+    for column, kind in (("graphics_profile", "TEXT"), ("avg_cpu", "REAL"), ("max_cpu", "REAL"),
+                         ("avg_rss", "INTEGER"), ("max_rss", "INTEGER"),
+                         ("read_bytes", "INTEGER"), ("write_bytes", "INTEGER")):
+        if column not in session_columns:
+            cursor.execute(f"ALTER TABLE play_sessions ADD COLUMN {column} {kind}")
+    stats_columns = _column_names(cursor, "game_stats")
+    for column, kind in (("profiled_sessions", "INTEGER DEFAULT 0"), ("avg_cpu", "REAL"),
+                         ("peak_cpu", "REAL"), ("peak_rss", "INTEGER")):
+        if column not in stats_columns:
+            cursor.execute(f"ALTER TABLE game_stats ADD COLUMN {column} {kind}")
+
+def _games_path_per_console(cursor):
+    """
+    v7: clave única por consola y ruta en lugar de UNIQUE(path), para que dos consolas
+    (p. ej. PS2 y Wii) puedan leer la misma carpeta de .iso. Con UNIQUE(path) de la v3
+    no puede haber repetidos por (console_id, path), así que no hace falta deduplicar.
+    """
+    cursor.execute("DROP INDEX IF EXISTS idx_games_path")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_games_console_path ON games(console_id, path)")
+
+MIGRATIONS = [
+    _add_scan_columns,
+    _unique_console_names,
+    _games_indexes,
+    _cover_cache_columns,
+    _play_history_tables,
+    _session_resource_columns,
+    _games_path_per_console,
+]
+
+def get_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn) -> int:
+    """Aplica las migraciones pendientes y devuelve la versión final del esquema."""
+    version = get_version(conn)
+    for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN")
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"🛠️ Base de datos migrada a la versión {target}.")
+    return get_version(conn)
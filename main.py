@@ -5,11 +5,15 @@ from PyQt5.QtWidgets import QApplication
 from ui.main_window import MultiverseMainWindow
 from ui.login_window import LoginWindow
 from core.online_manager import load_refresh_token, login_user
+from database.connection import DB_PATH
+from database.init_db import init_database
 
-if not os.path.exists("database/multiverse.db"):
+# Crea la base si no existe y aplica las migraciones pendientes si ya existía
+is_new_database = not os.path.exists(DB_PATH)
+if is_new_database:
     print("🔧 Base de datos no encontrada. Creando estructura inicial...")
-    from database.init_db import init_database
-    init_database()
+init_database()
+if is_new_database:
     print("✅ Base de datos creada con éxito.")
 
 if __name__ == "__main__":
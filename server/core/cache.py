@@ -0,0 +1,106 @@
+# server/core/cache.py
+"""
+Caché en memoria (TTL + LRU) para las lecturas de cada petición autenticada.
+
+- users:    email -> usuario (desvinculado de la sesión), para get_current_user.
+- licenses: (user_id, machine_id) -> vencimiento de la licencia activa, para /validate-license.
+
+Con ambos cargados, validar la licencia no consulta la base. Las escrituras que
+cambian estos datos invalidan la entrada a mano; el TTL acota lo que puede quedar
+desactualizado en otros procesos (cada worker de uvicorn tiene su propia caché).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+USER_CACHE_SIZE = int(os.getenv("MULTIVERSE_USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("MULTIVERSE_USER_CACHE_TTL", "60"))
+LICENSE_CACHE_SIZE = int(os.getenv("MULTIVERSE_LICENSE_CACHE_SIZE", "20000"))
+LICENSE_CACHE_TTL = float(os.getenv("MULTIVERSE_LICENSE_CACHE_TTL", "300"))
+
+
+class TTLCache:
+    def __init__(self, name, maxsize, ttl):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()    # clave -> (vence, valor)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, key):
+        """Valor cacheado o None (ausente o vencido)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_where(self, predicate):
+        """Quita todas las entradas cuya clave cumple el predicado."""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+user_cache = TTLCache("users", USER_CACHE_SIZE, USER_CACHE_TTL)
+license_cache = TTLCache("licenses", LICENSE_CACHE_SIZE, LICENSE_CACHE_TTL)
+
+
+def invalidate_user(email):
+    user_cache.invalidate(email)
+
+
+def invalidate_licenses(user_id, machine_id=None):
+    """Licencias de una máquina o, sin machine_id, todas las del usuario."""
+    if machine_id is not None:
+        license_cache.invalidate((user_id, machine_id))
+    else:
+        license_cache.invalidate_where(lambda key: key[0] == user_id)
+
+
+def cache_stats():
+    return {cache.name: cache.stats() for cache in (user_cache, license_cache)}
@@ -0,0 +1,128 @@
+# server/core/password_hasher.py
+"""
+Hash y verificación de contraseñas (bcrypt) fuera del event loop.
+
+bcrypt es CPU puro y tarda decenas de milisegundos a propósito: ejecutado en línea
+una ráfaga de logins ocupa todos los hilos y /healthz deja de responder. Acá corre
+en un pool de procesos acotado; las funciones son awaitables y, si ya hay
+HASH_QUEUE_DEPTH operaciones en curso o esperando, se rechaza enseguida con 503
+en lugar de encolar sin límite.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException
+
+# Costo de bcrypt para hashes nuevos (los de costo menor se rehashean al iniciar sesión)
+BCRYPT_ROUNDS = int(os.getenv("MULTIVERSE_BCRYPT_ROUNDS", "12"))
+# Procesos dedicados al hash
+HASH_WORKERS = int(os.getenv("MULTIVERSE_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# Operaciones admitidas a la vez (en curso + esperando); por encima se responde 503
+HASH_QUEUE_DEPTH = int(os.getenv("MULTIVERSE_HASH_QUEUE_DEPTH", str(HASH_WORKERS * 8)))
+
+# bcrypt solo usa los primeros 72 bytes
+_MAX_PASSWORD_BYTES = 72
+
+
+def _encode(password):
+    return password.encode("utf-8")[:_MAX_PASSWORD_BYTES]
+
+
+# === Funciones que corren en los procesos del pool ===
+
+def _hash(password_bytes, rounds):
+    return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _verify(password_bytes, hashed):
+    try:
+        return bcrypt.checkpw(password_bytes, hashed.encode("utf-8"))
+    except ValueError:
+        # Hash mal formado en la base: se trata como contraseña incorrecta
+        return False
+
+
+def hash_cost(hashed):
+    """Costo (log2 de rondas) de un hash bcrypt "$2b$12$...", o None si no se reconoce."""
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed):
+    cost = hash_cost(hashed)
+    return cost is not None and cost < BCRYPT_ROUNDS
+
+
+class PasswordHasher:
+    def __init__(self, workers=HASH_WORKERS, queue_depth=HASH_QUEUE_DEPTH, rounds=BCRYPT_ROUNDS):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.rounds = rounds
+        self.pending = 0
+        self._pool = None
+
+    def _executor(self):
+        # "spawn": un fork del servidor heredaría el socket que escucha y los locks
+        # que tengan tomados otros hilos en ese momento
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def start(self):
+        """Levanta los procesos al arrancar, para que el primer login no pague ese costo."""
+        pool = self._executor()
+        for future in [pool.submit(hash_cost, "") for _ in range(self.workers)]:
+            future.result()
+
+    @property
+    def saturated(self):
+        return self.pending >= self.queue_depth
+
+    def ensure_capacity(self):
+        """Rechaza la petición antes de tocar la base si el pool ya está lleno."""
+        if self.saturated:
+            raise HTTPException(
+                status_code=503,
+                detail="Servidor ocupado, intenta de nuevo en unos segundos",
+                headers={"Retry-After": "1"},
+            )
+
+    async def _run(self, func, *args):
+        self.ensure_capacity()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor(), func, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password):
+        return await self._run(_hash, _encode(password), self.rounds)
+
+    async def verify(self, password, hashed):
+        if not hashed:
+            return False
+        return await self._run(_verify, _encode(password), hashed)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+hasher = PasswordHasher()
+
+
+async def hash_password(password):
+    return await hasher.hash(password)
+
+
+async def verify_password(password, hashed):
+    return await hasher.verify(password, hashed)
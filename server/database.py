@@ -1,14 +1,50 @@
 # server/database.py
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
+# URL síncrona (psycopg2 / sqlite): la usan alembic y los scripts
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./server.db")
 
+# Pool de conexiones del servidor
+DB_POOL_SIZE = int(os.getenv("MULTIVERSE_DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("MULTIVERSE_DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("MULTIVERSE_DB_POOL_TIMEOUT", "10"))
+# Render cierra las conexiones inactivas: comprobarlas antes de usarlas y renovarlas cada tanto
+DB_POOL_PRE_PING = os.getenv("MULTIVERSE_DB_POOL_PRE_PING", "1") == "1"
+DB_POOL_RECYCLE = int(os.getenv("MULTIVERSE_DB_POOL_RECYCLE", "1800"))
+
+
+def async_url(url):
+    """Misma base con driver async: asyncpg para PostgreSQL, aiosqlite para SQLite."""
+    scheme, sep, rest = url.partition("://")
+    driver = scheme.split("+")[0]
+    if driver in ("postgres", "postgresql"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+ASYNC_DATABASE_URL = async_url(DATABASE_URL)
+
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    pool_recycle=DB_POOL_RECYCLE,
+)
+# expire_on_commit=False: los objetos siguen usables después del commit sin otra consulta
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession,
+                                       autoflush=False, expire_on_commit=False)
+Base = declarative_base()
@@ -1,18 +1,25 @@
 # server/main.py
-from fastapi import FastAPI, Depends, HTTPException, status, Form, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Form, Request, Query
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update, tuple_, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from pydantic import BaseModel
 from server import models, database
+from server.core.password_hasher import hasher, hash_password, verify_password, needs_rehash
+from server.core.cache import user_cache, license_cache, invalidate_user, invalidate_licenses, cache_stats
 from core.email_manager import send_password_reset_email
 import os
-import bcrypt
 import secrets
 import hmac
 import hashlib
 import httpx
+import base64
+import json
 
 # 👇 Validación de variables de entorno al iniciar
 def validate_env():
@@ -26,7 +33,19 @@ validate_env()
 
 app = FastAPI(title="Multiverse Gamer API")
 
-models.Base.metadata.create_all(bind=database.engine)
+@app.on_event("startup")
+async def create_tables():
+    async with database.async_engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+
+@app.on_event("startup")
+def start_password_hasher():
+    hasher.start()
+
+@app.on_event("shutdown")
+async def shutdown_resources():
+    hasher.shutdown()
+    await database.async_engine.dispose()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
@@ -53,41 +72,36 @@ class LicenseActivateRequest(BaseModel):
     machine_id: str
     plan: str
 
-def get_db():
-    db = database.SessionLocal()
-    try:
+async def get_db():
+    async with database.AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
 
-def get_password_hash(password: str) -> str:
-    password_bytes = password.encode('utf-8')[:72]
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+async def get_user(db: AsyncSession, email: str):
+    result = await db.scalars(select(models.User).where(models.User.email == email))
+    return result.first()
 
-def get_user(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
-
-def authenticate_user(db: Session, email: str, password: str):
-    user = get_user(db, email)
-    if not user or not verify_password(password, user.hashed_password):
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await get_user(db, email)
+    # La conexión vuelve al pool mientras se espera el hash (el usuario queda ya cargado)
+    await db.close()
+    if not user or not await verify_password(password, user.hashed_password):
         return False
+    # Hash con costo viejo: se actualiza ahora que se conoce la contraseña (si hay lugar en el pool)
+    if needs_rehash(user.hashed_password) and not hasher.saturated:
+        user.hashed_password = await hash_password(password)
+        await db.execute(update(models.User).where(models.User.id == user.id)
+                         .values(hashed_password=user.hashed_password))
+        await db.commit()
+        invalidate_user(user.email)
     return user
 
 # ✅ DEFINICIÓN CORRECTA
-def create_access_token( dict):
+def create_access_token(data: dict):
     """
     Crea un token JWT.
 
     Args:
-         Diccionario con los datos a codificar en el token.
+        data: Diccionario con los datos a codificar en el token.
 
     Returns:
         str: El token JWT codificado.
@@ -98,13 +112,13 @@ def create_access_token( dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def create_refresh_token( dict):
+def create_refresh_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
@@ -118,9 +132,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = get_user(db, email=token_data.email)
+    user = user_cache.get(token_data.email)
     if user is None:
-        raise credentials_exception
+        user = await get_user(db, email=token_data.email)
+        if user is None:
+            raise credentials_exception
+        # Desvinculado de la sesión: solo se lee desde las demás peticiones
+        db.expunge(user)
+        user_cache.set(user.email, user)
     return user
 
 @app.get("/healthz")
@@ -132,19 +151,28 @@ def read_root():
     return {"message": "Multiverse Gamer API - Funcionando"}
 
 @app.post("/register")
-def register(email: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
-    if get_user(db, email):
+async def register(email: str = Form(...), password: str = Form(...), db: AsyncSession = Depends(get_db)):
+    # Un email repetido se rechaza sin ocupar el pool de hash
+    if await get_user(db, email):
         raise HTTPException(status_code=400, detail="Email ya registrado")
-    hashed = get_password_hash(password)
+    # La conexión vuelve al pool mientras se espera el hash
+    await db.close()
+    hashed = await hash_password(password)
     new_user = models.User(email=email, hashed_password=hashed, is_admin=(email == "rodrigoaguirre196@gmail.com"))
     db.add(new_user)
-    db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Otro registro con el mismo email terminó mientras se calculaba el hash
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email ya registrado")
     return {"msg": "Usuario creado"}
 
 # ✅ CORREGIDO: definición de función
 @app.post("/token")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    hasher.ensure_capacity()
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Credenciales inválidas")
     access_token = create_access_token(data={"sub": user.email})  # ✅ Ahora funciona
@@ -152,7 +180,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @app.post("/token/refresh")
-def refresh_token(refresh_token: str = Form(...), db: Session = Depends(get_db)):
+async def refresh_token(refresh_token: str = Form(...), db: AsyncSession = Depends(get_db)):
     try:
         payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
         if payload.get("type") != "refresh":
@@ -160,7 +188,7 @@ def refresh_token(refresh_token: str = Form(...), db: Session = Depends(get_db))
         email = payload.get("sub")
         if not email:
             raise HTTPException(status_code=401, detail="Token inválido")
-        user = get_user(db, email)
+        user = await get_user(db, email)
         if not user:
             raise HTTPException(status_code=401, detail="Usuario no encontrado")
         new_access_token = create_access_token(data={"sub": email})  # ✅ Ahora funciona
@@ -169,8 +197,8 @@ def refresh_token(refresh_token: str = Form(...), db: Session = Depends(get_db))
         raise HTTPException(status_code=401, detail="Token expirado o inválido")
 
 @app.post("/auth/forgot-password")
-def forgot_password(email: str = Form(...), db: Session = Depends(get_db)):
-    user = get_user(db, email)
+async def forgot_password(email: str = Form(...), db: AsyncSession = Depends(get_db)):
+    user = await get_user(db, email)
     if not user:
         return {"msg": "Si el email es válido, recibirás un enlace."}
     
@@ -178,57 +206,65 @@ def forgot_password(email: str = Form(...), db: Session = Depends(get_db)):
     expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
     reset_token = models.PasswordResetToken(email=email, token=token, expires_at=expires_at)
     db.add(reset_token)
-    db.commit()
+    await db.commit()
     
     reset_url = f"https://multiverse-server.onrender.com/auth/reset?token={token}"
-    send_password_reset_email(email, token)
+    await run_in_threadpool(send_password_reset_email, email, token)
     return {"msg": "Email enviado."}
 
 @app.post("/auth/reset-password")
-def reset_password(token: str = Form(...), new_password: str = Form(...), db: Session = Depends(get_db)):
-    reset_token = db.query(models.PasswordResetToken).filter(
+async def reset_password(token: str = Form(...), new_password: str = Form(...), db: AsyncSession = Depends(get_db)):
+    hashed = await hash_password(new_password)
+    reset_token = (await db.scalars(select(models.PasswordResetToken).where(
         models.PasswordResetToken.token == token,
         models.PasswordResetToken.expires_at > datetime.now(timezone.utc)
-    ).first()
+    ))).first()
     if not reset_token:
         raise HTTPException(status_code=400, detail="Token inválido o expirado")
     
-    user = get_user(db, reset_token.email)
+    user = await get_user(db, reset_token.email)
     if user:
-        user.hashed_password = get_password_hash(new_password)
-        db.delete(reset_token)
-        db.commit()
+        user.hashed_password = hashed
+        await db.delete(reset_token)
+        await db.commit()
+        invalidate_user(user.email)
     return {"msg": "Contraseña actualizada."}
 
 # 👇 CORREGIDO: recibe JSON
 @app.post("/validate-license")
-def validate_license(
+async def validate_license(
     request: LicenseValidateRequest,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    license = db.query(models.License).filter(
-        models.License.machine_id == request.machine_id,
-        models.License.user_id == current_user.id,
-        models.License.is_active == True
-    ).first()
-    if not license or datetime.now(timezone.utc) > license.valid_until:
+    key = (current_user.id, request.machine_id)
+    valid_until = license_cache.get(key)
+    if valid_until is None:
+        license = (await db.scalars(select(models.License).where(
+            models.License.machine_id == request.machine_id,
+            models.License.user_id == current_user.id,
+            models.License.is_active == True
+        ))).first()
+        if license:
+            valid_until = license.valid_until
+            license_cache.set(key, valid_until)
+    if valid_until is None or datetime.now(timezone.utc) > valid_until:
         raise HTTPException(status_code=403, detail="Licencia inválida")
-    return {"status": "valid", "expires": license.valid_until.isoformat()}
+    return {"status": "valid", "expires": valid_until.isoformat()}
 
 # 👇 NUEVO: activar licencia con machine_id real
 @app.post("/license/activate")
-def activate_license(
+async def activate_license(
     request: LicenseActivateRequest,
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Verificar que el usuario tenga una suscripción activa
-    subscription = db.query(models.Subscription).filter(
+    subscription = (await db.scalars(select(models.Subscription).where(
         models.Subscription.user_id == current_user.id,
         models.Subscription.status == "active",
         models.Subscription.end_date > datetime.now(timezone.utc)
-    ).first()
+    ))).first()
     if not subscription:
         raise HTTPException(status_code=403, detail="No tienes suscripción activa")
     
@@ -240,31 +276,34 @@ def activate_license(
         is_active=True
     )
     db.add(new_license)
-    db.commit()
+    await db.commit()
+    invalidate_licenses(current_user.id, request.machine_id)
     return {"status": "activated", "expires": new_license.valid_until.isoformat()}
 
 # 👇 NUEVO: cancelar suscripción
 @app.post("/subscription/cancel")
-def cancel_subscription(
+async def cancel_subscription(
     subscription_id: str = Form(...),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Verificar que la suscripción pertenece al usuario
-    subscription = db.query(models.Subscription).filter(
+    subscription = (await db.scalars(select(models.Subscription).where(
         models.Subscription.id == subscription_id,
         models.Subscription.user_id == current_user.id
-    ).first()
+    ))).first()
     if not subscription:
         raise HTTPException(status_code=404, detail="Suscripción no encontrada")
 
     try:
         from core.payment_manager import cancel_mercadopago_subscription
-        success = cancel_mercadopago_subscription(subscription_id)
+        success = await run_in_threadpool(cancel_mercadopago_subscription, subscription_id)
         if success:
             # Actualizar estado local
             subscription.status = "cancelled"
-            db.commit()
+            await db.commit()
+            invalidate_user(current_user.email)
+            invalidate_licenses(current_user.id)
             return {"status": "cancelled"}
         else:
             raise HTTPException(status_code=500, detail="No se pudo cancelar en Mercado Pago")
@@ -280,8 +319,8 @@ def logout():
 
 # 👇 ELIMINADO: ya no se crea licencia aquí
 @app.get("/payment/success")
-def payment_success(email: str, plan: str, db: Session = Depends(get_db)):
-    user = get_user(db, email)
+async def payment_success(email: str, plan: str, db: AsyncSession = Depends(get_db)):
+    user = await get_user(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return {"message": "Pago exitoso. Ahora activa tu licencia desde el launcher."}
@@ -295,7 +334,7 @@ def payment_pending():
     return {"message": "Pago pendiente de confirmación."}
 
 @app.post("/payment/mercadopago")
-def mercadopago_payment(payment: PaymentRequest, db: Session = Depends(get_db)):
+def mercadopago_payment(payment: PaymentRequest):
     from core.payment_manager import create_mercadopago_payment
     try:
         payment_url = create_mercadopago_payment(payment.email, payment.plan)
@@ -304,7 +343,7 @@ def mercadopago_payment(payment: PaymentRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error en Mercado Pago: {str(e)}")
 
 @app.post("/payment/paypal")
-def paypal_payment(payment: PaymentRequest, db: Session = Depends(get_db)):
+def paypal_payment(payment: PaymentRequest):
     from core.payment_manager import create_paypal_payment
     try:
         payment_url = create_paypal_payment(payment.email, payment.plan)
@@ -312,20 +351,133 @@ def paypal_payment(payment: PaymentRequest, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error en PayPal: {str(e)}")
 
+# Columnas que puede pedir /admin/users (se leen sin crear objetos del ORM)
+USER_FIELDS = {
+    "id": models.User.id,
+    "email": models.User.email,
+    "created_at": models.User.created_at,
+    "is_admin": models.User.is_admin,
+}
+USERS_PAGE_MAX = 1000
+USERS_EXPORT_BATCH = 1000
+
+def _encode_cursor(value, user_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([value, user_id]).encode()).decode()
+
+def _decode_cursor(cursor, sort):
+    try:
+        value, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort == "created_at" and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, int(user_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+def _users_query(fields, sort, order, email, is_admin, created_from, created_to):
+    """Consulta base de usuarios filtrada y ordenada por (sort, id), que es la clave del cursor."""
+    sort_column = USER_FIELDS[sort]
+    columns = [USER_FIELDS[f] for f in fields]
+    query = select(*columns, sort_column.label("_sort"), models.User.id.label("_id"))
+    if email:
+        # % y _ del texto buscado son literales
+        pattern = email.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.where(models.User.email.ilike(f"%{pattern}%", escape="\\"))
+    if is_admin is not None:
+        query = query.where(models.User.is_admin == is_admin)
+    if created_from:
+        query = query.where(models.User.created_at >= created_from)
+    if created_to:
+        query = query.where(models.User.created_at < created_to)
+    # NULL cuenta como el valor más alto (el orden por defecto de PostgreSQL, que
+    # así puede recorrer el índice en ambos sentidos); _after usa el mismo criterio
+    if order == "desc":
+        return query.order_by(sort_column.desc().nulls_first(), models.User.id.desc())
+    return query.order_by(sort_column.asc().nulls_last(), models.User.id)
+
+def _after(query, sort, order, key):
+    """Página siguiente a partir de la clave (valor, id) de la última fila."""
+    sort_column = USER_FIELDS[sort]
+    value, user_id = key
+    if value is None:
+        # Dentro del tramo de NULL se avanza por id; en desc siguen las filas con valor
+        if order == "desc":
+            return query.where(or_(and_(sort_column.is_(None), models.User.id < user_id),
+                                   sort_column.isnot(None)))
+        return query.where(sort_column.is_(None), models.User.id > user_id)
+    keyset = tuple_(sort_column, models.User.id)
+    if order == "desc":
+        return query.where(keyset < key)
+    return query.where(or_(keyset > key, sort_column.is_(None)))
+
+def _user_record(row, fields):
+    record = {}
+    for field in fields:
+        value = getattr(row, field)
+        record[field] = value.isoformat() if isinstance(value, datetime) else value
+    return record
+
 @app.get("/admin/users")
-def get_all_users(current_user: models.User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_all_users(
+    limit: int = Query(100, ge=1, le=USERS_PAGE_MAX),
+    cursor: str | None = None,
+    sort: str = Query("created_at", pattern="^(created_at|email|id)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    fields: str = "email,created_at,is_admin",
+    email: str | None = None,
+    is_admin: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Usuarios paginados por cursor (keyset sobre sort + id), con filtros y columnas a elección.
+    format=ndjson exporta todas las filas que cumplen el filtro, una por línea, en streaming.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Acceso denegado")
+    field_list = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in field_list if f not in USER_FIELDS]
+    if not field_list or unknown:
+        raise HTTPException(status_code=400, detail=f"Campos inválidos: {', '.join(unknown) or fields}")
+    query = _users_query(field_list, sort, order, email, is_admin, created_from, created_to)
+    key = _decode_cursor(cursor, sort) if cursor else None
+
+    if format == "ndjson":
+        async def export():
+            # Sesión propia y lotes cortos: no se retiene una conexión durante toda la descarga
+            last = key
+            async with database.AsyncSessionLocal() as session:
+                while True:
+                    page = query if last is None else _after(query, sort, order, last)
+                    rows = (await session.execute(page.limit(USERS_EXPORT_BATCH))).all()
+                    await session.close()
+                    if not rows:
+                        return
+                    yield "".join(json.dumps(_user_record(row, field_list)) + "\n" for row in rows)
+                    last = (rows[-1]._sort, rows[-1]._id)
+        return StreamingResponse(export(), media_type="application/x-ndjson")
+
+    page = query if key is None else _after(query, sort, order, key)
+    rows = (await db.execute(page.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1]._sort, rows[-1]._id)
+    return {"items": [_user_record(row, field_list) for row in rows], "next_cursor": next_cursor}
+
+@app.get("/admin/cache-stats")
+async def get_cache_stats(current_user: models.User = Depends(get_current_user)):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Acceso denegado")
-    users = db.query(models.User).all()
-    return [{
-        "email": u.email,
-        "created_at": u.created_at.isoformat() if u.created_at else None,
-        "is_admin": u.is_admin
-    } for u in users]
+    return cache_stats()
 
 # 👇 WEBHOOK DE MERCADOPAGO PARA SUSCRIPCIONES (solo marca pago aprobado)
 @app.post("/webhooks/mercadopago")
-async def mercadopago_webhook(request: Request, db: Session = Depends(get_db)):
+async def mercadopago_webhook(request: Request, db: AsyncSession = Depends(get_db)):
     signature = request.headers.get("x-signature")
     if not signature:
         raise HTTPException(status_code=400, detail="Firma ausente")
@@ -377,13 +529,13 @@ async def mercadopago_webhook(request: Request, db: Session = Depends(get_db)):
         plan = "mensual"
         
         if status == "approved" and email:
-            user = get_user(db, email)
+            user = await get_user(db, email)
             if not user:
                 # Opcional: crear usuario si no existe
-                hashed = get_password_hash(secrets.token_urlsafe(16))
+                hashed = await hash_password(secrets.token_urlsafe(16))
                 user = models.User(email=email, hashed_password=hashed)
                 db.add(user)
-                db.commit()
+                await db.commit()
             
             # Crear suscripción (NO licencia)
             subscription = models.Subscription(
@@ -393,11 +545,16 @@ async def mercadopago_webhook(request: Request, db: Session = Depends(get_db)):
                 end_date=datetime.now(timezone.utc) + timedelta(days=30)
             )
             db.add(subscription)
-            db.commit()
+            await db.commit()
+            invalidate_user(user.email)
+            invalidate_licenses(user.id)
             return {"status": "suscripcion_activada"}
         
         return {"status": "evento_procesado", "payment_status": status}
         
+    except HTTPException:
+        # Errores ya clasificados (p. ej. 503 del pool de hash) se devuelven tal cual
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error procesando webhook: {str(e)}")
 
@@ -1,5 +1,5 @@
 # server/models.py
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, text
 from .database import Base
 from datetime import datetime
 
@@ -10,6 +10,9 @@ class User(Base):
     hashed_password = Column(String)
     is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
@@ -20,6 +23,9 @@ class Subscription(Base):
     start_date = Column(DateTime, default=datetime.utcnow)
     end_date = Column(DateTime)
     mp_subscription_id = Column(String, unique=True, nullable=True)  # ← Nuevo campo
+    __table_args__ = (
+        Index("ix_subscriptions_user_status_end", "user_id", "status", "end_date"),
+    )
 
 class License(Base):
     __tablename__ = "licenses"
@@ -29,6 +35,10 @@ class License(Base):
     plan = Column(String)
     valid_until = Column(DateTime(timezone=True))
     is_active = Column(Boolean, default=True)
+    __table_args__ = (
+        Index("ix_licenses_user_machine_active", "user_id", "machine_id",
+              postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+    )
 
 class PasswordResetToken(Base):
     __tablename__ = "password_reset_tokens"
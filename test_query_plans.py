@@ -0,0 +1,170 @@
+# test_query_plans.py
+"""
+Carga filas sintéticas y comprueba con EXPLAIN que las búsquedas del servidor
+(licencia activa, suscripción vigente, token de reseteo) usan sus índices.
+
+Usa su propia base, que se borra y se recrea: con pytest, un SQLite en tmp_path;
+como script, un SQLite en memoria. QUERY_PLAN_DATABASE_URL apunta a otra base
+(también postgresql://), pero como se le borran todas las tablas hay que
+confirmarlo con QUERY_PLAN_ALLOW_DROP=1.
+QUERY_PLAN_ROWS: filas por tabla (por defecto 20.000, para que pytest lo corra
+rápido; con QUERY_PLAN_ROWS=1000000 se prueba a escala real).
+
+    pytest test_query_plans.py
+    QUERY_PLAN_ROWS=1000000 python test_query_plans.py
+    QUERY_PLAN_DATABASE_URL=postgresql://... QUERY_PLAN_ALLOW_DROP=1 python test_query_plans.py
+"""
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./server.db")
+from server import models
+
+DATABASE_URL = os.getenv("QUERY_PLAN_DATABASE_URL")
+ALLOW_DROP = os.getenv("QUERY_PLAN_ALLOW_DROP") == "1"
+ROWS = int(os.getenv("QUERY_PLAN_ROWS", "20000"))
+USERS = max(1, ROWS // 10)
+CHUNK = 50000
+
+NOW = datetime(2026, 1, 1)
+
+
+def load(conn, table, make_row, count):
+    start = time.perf_counter()
+    for offset in range(0, count, CHUNK):
+        conn.execute(table.insert(), [make_row(i) for i in range(offset, min(count, offset + CHUNK))])
+    print(f"   {table.name}: {count:,} filas en {time.perf_counter() - start:.1f} s")
+
+
+def load_data(engine):
+    rnd = random.Random(42)
+    statuses = ["active", "cancelled", "expired"]
+    with engine.begin() as conn:
+        load(conn, models.User.__table__,
+             lambda i: {"id": i + 1, "email": f"user{i}@bench.local", "hashed_password": "x", "is_admin": False},
+             USERS)
+        load(conn, models.License.__table__,
+             lambda i: {"user_id": rnd.randint(1, USERS), "machine_id": f"machine-{i}", "plan": "mensual",
+                        "valid_until": NOW + timedelta(days=rnd.randint(-60, 60)),
+                        "is_active": rnd.random() < 0.2},
+             ROWS)
+        load(conn, models.Subscription.__table__,
+             lambda i: {"user_id": rnd.randint(1, USERS), "plan": "mensual", "status": rnd.choice(statuses),
+                        "start_date": NOW - timedelta(days=30), "end_date": NOW + timedelta(days=rnd.randint(-60, 60))},
+             ROWS)
+        load(conn, models.PasswordResetToken.__table__,
+             lambda i: {"email": f"user{i % USERS}@bench.local", "token": f"token-{i}",
+                        "expires_at": NOW + timedelta(hours=rnd.randint(-48, 1))},
+             ROWS)
+
+
+# Mismas consultas que server/main.py
+QUERIES = {
+    "validate_license": (
+        select(models.License).where(
+            models.License.machine_id == "machine-123",
+            models.License.user_id == 42,
+            models.License.is_active == True
+        ),
+        "licenses", {"ix_licenses_user_machine_active"},
+    ),
+    "activate_license": (
+        select(models.Subscription).where(
+            models.Subscription.user_id == 42,
+            models.Subscription.status == "active",
+            models.Subscription.end_date > NOW
+        ),
+        "subscriptions", {"ix_subscriptions_user_status_end"},
+    ),
+    "reset_password": (
+        select(models.PasswordResetToken).where(
+            models.PasswordResetToken.token == "token-123",
+            models.PasswordResetToken.expires_at > NOW
+        ),
+        # token es único: basta su propio índice (nombre en SQLite y en PostgreSQL)
+        "password_reset_tokens", {"sqlite_autoindex_password_reset_tokens_1", "password_reset_tokens_token_key"},
+    ),
+}
+
+
+def explain_sqlite(conn, stmt, table):
+    """Índices usados sobre la tabla, o None si la recorre entera."""
+    compiled = stmt.compile(bind=conn)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+    details = [row[-1] for row in rows]
+    used = set()
+    for detail in details:
+        words = detail.split()
+        if words[:2] == ["SCAN", table] and "INDEX" not in words:
+            return None, details
+        if "INDEX" in words and table in words:
+            used.add(words[words.index("INDEX") + 1])
+    return used, details
+
+
+def explain_postgresql(conn, stmt, table):
+    compiled = stmt.compile(bind=conn)
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    used, nodes = set(), [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == table:
+            return None, plan
+        if "Index Name" in node:
+            used.add(node["Index Name"])
+        nodes.extend(node.get("Plans", []))
+    return used, plan
+
+
+def database_url(default):
+    """QUERY_PLAN_DATABASE_URL si se confirmó que se puede borrar; si no, la base temporal."""
+    if not DATABASE_URL:
+        return default
+    if not ALLOW_DROP:
+        raise RuntimeError("QUERY_PLAN_DATABASE_URL se borra entera: confirmarlo con QUERY_PLAN_ALLOW_DROP=1")
+    return DATABASE_URL
+
+
+def check_query_plans(url):
+    """Carga los datos y devuelve la lista de consultas que no usan el índice esperado."""
+    engine = create_engine(url)
+    print(f"🗄️  Base de prueba: {engine.url.render_as_string(hide_password=True)} ({ROWS:,} filas por tabla)")
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    load_data(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+    explain = explain_postgresql if engine.dialect.name == "postgresql" else explain_sqlite
+    failures = []
+    with engine.connect() as conn:
+        for name, (stmt, table, expected) in QUERIES.items():
+            used, plan = explain(conn, stmt, table)
+            if used is None:
+                failures.append(name)
+                print(f"❌ {name}: recorre {table} completa\n   {plan}")
+            elif not used & expected:
+                failures.append(name)
+                print(f"❌ {name}: usa {sorted(used)}, se esperaba {sorted(expected)}\n   {plan}")
+            else:
+                print(f"✅ {name}: {', '.join(sorted(used & expected))}")
+    engine.dispose()
+    return failures
+
+
+def test_query_plans(tmp_path):
+    failures = check_query_plans(database_url(f"sqlite:///{tmp_path / 'query_plans.db'}"))
+    assert not failures, f"Consultas sin el índice esperado: {', '.join(failures)}"
+
+
+if __name__ == "__main__":
+    sys.exit(1 if check_query_plans(database_url("sqlite://")) else 0)
@@ -1,10 +1,18 @@
 # ui/admin_window.py
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem
-from core.online_manager import get_all_users
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+                             QTableWidget, QTableWidgetItem, QFileDialog)
+from PyQt5.QtCore import QTimer
+from core.online_manager import get_users_page, export_users
+
+# Usuarios por página; la siguiente se pide al acercarse al final de la tabla
+PAGE_SIZE = 100
 
 class AdminWindow(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, token=None):
         super().__init__(parent)
+        self.token = token
+        self.next_cursor = None
+        self.has_more = True
         self.setWindowTitle("Panel de Administrador")
         self.setFixedSize(600, 400)
         self.init_ui()
@@ -13,17 +21,56 @@ class AdminWindow(QDialog):
         layout = QVBoxLayout(self)
         layout.addWidget(QLabel("Usuarios registrados:"))
 
+        filters = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Filtrar por email...")
+        # Esperar a que se termine de escribir antes de consultar
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(400)
+        self.search_timer.timeout.connect(self.reload_users)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        filters.addWidget(self.search_input)
+        export_btn = QPushButton("Exportar...")
+        export_btn.clicked.connect(self.export_users)
+        filters.addWidget(export_btn)
+        layout.addLayout(filters)
+
         self.table = QTableWidget()
         self.table.setColumnCount(3)
         self.table.setHorizontalHeaderLabels(["Email", "Fecha de registro", "Es admin"])
+        self.table.verticalScrollBar().valueChanged.connect(self.on_scroll)
         layout.addWidget(self.table)
 
+        self.reload_users()
+
+    def reload_users(self):
+        self.table.setRowCount(0)
+        self.next_cursor = None
+        self.has_more = True
         self.load_users()
 
     def load_users(self):
-        users = get_all_users()  # ← Debes implementar este endpoint en FastAPI
-        self.table.setRowCount(len(users))
-        for row, user in enumerate(users):
+        """Agrega la página siguiente al final de la tabla."""
+        if not self.token or not self.has_more:
+            return
+        page = get_users_page(self.token, cursor=self.next_cursor, limit=PAGE_SIZE,
+                              email=self.search_input.text().strip() or None)
+        self.next_cursor = page["next_cursor"]
+        self.has_more = self.next_cursor is not None
+        start = self.table.rowCount()
+        self.table.setRowCount(start + len(page["items"]))
+        for row, user in enumerate(page["items"], start):
             self.table.setItem(row, 0, QTableWidgetItem(user["email"]))
-            self.table.setItem(row, 1, QTableWidgetItem(user["created_at"]))
-            self.table.setItem(row, 2, QTableWidgetItem("Sí" if user["is_admin"] else "No"))
\ No newline at end of file
+            self.table.setItem(row, 1, QTableWidgetItem(user["created_at"] or ""))
+            self.table.setItem(row, 2, QTableWidgetItem("Sí" if user["is_admin"] else "No"))
+
+    def on_scroll(self, value):
+        bar = self.table.verticalScrollBar()
+        if value >= bar.maximum() - bar.pageStep():
+            self.load_users()
+
+    def export_users(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar usuarios", "usuarios.ndjson", "NDJSON (*.ndjson)")
+        if path and self.token:
+            export_users(self.token, path, email=self.search_input.text().strip() or None)
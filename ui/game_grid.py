@@ -0,0 +1,220 @@
+# ui/game_grid.py
+"""
+Grilla virtualizada de juegos: un QAbstractListModel con los datos y un delegate
+que dibuja cada tarjeta. QListView (modo icono) solo pinta las tarjetas visibles,
+así que cambiar de consola o de modo no crea ningún widget por juego.
+"""
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QPainter, QPen
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle, QListView
+
+GAME_ID_ROLE = Qt.UserRole + 1
+CONSOLE_ROLE = Qt.UserRole + 2
+FAVORITE_ROLE = Qt.UserRole + 3
+COVER_ROLE = Qt.UserRole + 4
+
+# Medidas de la tarjeta: modo normal / Big Picture
+CARD_METRICS = {
+    False: {"width": 200, "height": 300, "cover": 180, "icon": 24, "title": 14, "console": 12, "button": 32},
+    True: {"width": 400, "height": 500, "cover": 340, "icon": 30, "title": 24, "console": 18, "button": 44},
+}
+CARD_MARGIN = 5
+
+
+class GameListModel(QAbstractListModel):
+    """Filas: [id, título, consola, favorito, ruta, carátula]. La carátula viene resuelta del escaneo."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._games = []
+        self._rows_by_id = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._games)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        game = self._games[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return game[1]
+        if role == GAME_ID_ROLE:
+            return game[0]
+        if role == CONSOLE_ROLE:
+            return game[2]
+        if role == FAVORITE_ROLE:
+            return bool(game[3])
+        if role == COVER_ROLE:
+            return game[5] or ""
+        return None
+
+    def set_games(self, rows):
+        self.beginResetModel()
+        self._games = [list(row) for row in rows]
+        self._reindex()
+        self.endResetModel()
+
+    def _reindex(self):
+        self._rows_by_id = {game[0]: row for row, game in enumerate(self._games)}
+
+    def row_for_id(self, game_id):
+        return self._rows_by_id.get(game_id)
+
+    def game_id(self, row):
+        return self._games[row][0]
+
+    def remove_ids(self, game_ids):
+        rows = sorted((self._rows_by_id[gid] for gid in game_ids if gid in self._rows_by_id), reverse=True)
+        for row in rows:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._games[row]
+            self.endRemoveRows()
+        if rows:
+            self._reindex()
+
+    def add_rows(self, rows):
+        """Inserta juegos manteniendo el orden por id (el mismo que usa load_games)."""
+        for game in sorted(rows):
+            game_id = game[0]
+            if game_id in self._rows_by_id:
+                continue
+            row = len(self._games)
+            while row > 0 and self._games[row - 1][0] > game_id:
+                row -= 1
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._games.insert(row, list(game))
+            self.endInsertRows()
+            self._reindex()
+
+    def set_favorite(self, game_id, is_favorite):
+        row = self._rows_by_id.get(game_id)
+        if row is None:
+            return
+        self._games[row][3] = is_favorite
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [FAVORITE_ROLE])
+
+
+class GameCardDelegate(QStyledItemDelegate):
+    """
+    Dibuja la tarjeta del juego y traduce los clics en la estrella, Jugar y ⚙️ a señales.
+    Las carátulas se piden a un ThumbnailService: mientras no están listas se dibuja
+    el recuadro gris y la tarjeta se repinta cuando llega la miniatura.
+    """
+    favorite_clicked = pyqtSignal(int)
+    play_clicked = pyqtSignal(int)
+    config_clicked = pyqtSignal(int)
+
+    def __init__(self, theme, play_text, thumbnails, parent=None):
+        super().__init__(parent)
+        self.theme = theme
+        self.play_text = play_text
+        self.thumbnails = thumbnails
+        self.is_big_picture = False
+
+    def metrics(self):
+        return CARD_METRICS[self.is_big_picture]
+
+    def sizeHint(self, option, index):
+        m = self.metrics()
+        return QSize(m["width"] + 2 * CARD_MARGIN, m["height"] + 2 * CARD_MARGIN)
+
+    def _layout(self, rect):
+        """Rectángulos de cada parte de la tarjeta dentro de rect."""
+        m = self.metrics()
+        card = QRect(rect.x() + CARD_MARGIN, rect.y() + CARD_MARGIN, m["width"], m["height"])
+        pad = 8
+        icon = m["icon"]
+        top = card.y() + pad
+        config = QRect(card.x() + pad, top, icon, icon)
+        star = QRect(card.right() - pad - icon, top, icon, icon)
+        cover = QRect(card.x() + (m["width"] - m["cover"]) // 2, top + icon + 4, m["cover"], m["cover"])
+        title = QRect(card.x() + pad, cover.bottom() + 6, m["width"] - 2 * pad, int(m["title"] * 1.6))
+        console = QRect(card.x() + pad, title.bottom() + 1, m["width"] - 2 * pad, int(m["console"] * 1.5))
+        play = QRect(card.x() + pad, card.bottom() - pad - m["button"], m["width"] - 2 * pad, m["button"])
+        return {"card": card, "config": config, "star": star, "cover": cover,
+                "title": title, "console": console, "play": play}
+
+    def paint(self, painter, option, index):
+        m = self.metrics()
+        r = self._layout(option.rect)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        selected = bool(option.state & QStyle.State_Selected)
+        painter.setPen(QPen(QColor(self.theme["accent"]), 3) if selected else Qt.NoPen)
+        painter.setBrush(QColor(self.theme["card_bg"]))
+        painter.drawRoundedRect(r["card"], 10, 10)
+
+        font = QFont(option.font)
+        font.setPixelSize(m["icon"] - 6)
+        painter.setFont(font)
+        painter.setPen(QColor(self.theme["favorite"]))
+        painter.drawText(r["star"], Qt.AlignCenter, "★" if index.data(FAVORITE_ROLE) else "☆")
+        painter.setPen(QColor(self.theme["text_secondary"]))
+        painter.drawText(r["config"], Qt.AlignCenter, "⚙")
+
+        pixmap = self.thumbnails.get(index.data(COVER_ROLE), m["cover"])
+        if pixmap:
+            x = r["cover"].x() + (r["cover"].width() - pixmap.width()) // 2
+            y = r["cover"].y() + (r["cover"].height() - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+        else:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor("#444"))
+            painter.drawRoundedRect(r["cover"], 8, 8)
+
+        title = index.data(Qt.DisplayRole) or ""
+        font.setPixelSize(m["title"])
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor(self.theme["text"]))
+        painter.drawText(r["title"], Qt.AlignCenter,
+                         painter.fontMetrics().elidedText(title, Qt.ElideRight, r["title"].width()))
+
+        font.setPixelSize(m["console"])
+        font.setBold(False)
+        painter.setFont(font)
+        painter.setPen(QColor(self.theme["text_secondary"]))
+        painter.drawText(r["console"], Qt.AlignCenter, index.data(CONSOLE_ROLE) or "")
+
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(self.theme["accent"]))
+        painter.drawRoundedRect(r["play"], 5, 5)
+        font.setPixelSize(m["title"] + 2 if self.is_big_picture else m["title"])
+        painter.setFont(font)
+        painter.setPen(QColor("white"))
+        painter.drawText(r["play"], Qt.AlignCenter, self.play_text)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            r = self._layout(option.rect)
+            game_id = index.data(GAME_ID_ROLE)
+            if r["star"].contains(event.pos()):
+                self.favorite_clicked.emit(game_id)
+                return True
+            if r["play"].contains(event.pos()):
+                self.play_clicked.emit(game_id)
+                return True
+            if r["config"].contains(event.pos()):
+                self.config_clicked.emit(game_id)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+def create_game_view(parent=None):
+    """QListView en modo icono configurado para tarjetas de tamaño uniforme."""
+    view = QListView(parent)
+    view.setViewMode(QListView.IconMode)
+    view.setResizeMode(QListView.Adjust)
+    view.setMovement(QListView.Static)
+    view.setUniformItemSizes(True)
+    view.setLayoutMode(QListView.Batched)
+    view.setBatchSize(200)
+    view.setSelectionMode(QListView.SingleSelection)
+    view.setVerticalScrollMode(QListView.ScrollPerPixel)
+    view.setMouseTracking(True)
+    view.setFrameShape(QListView.NoFrame)
+    return view
@@ -2,11 +2,15 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QFormLayout, QComboBox, QPushButton
 import json
 
+UNSUPPORTED_TOOLTIP = "El emulador de esta consola no acepta este ajuste; usa su propia configuración."
+
 class GraphicsSettingsWindow(QDialog):
-    def __init__(self, parent=None, current_profile=None):
+    def __init__(self, parent=None, current_profile=None, supported_keys=None):
         super().__init__(parent)
         self.setWindowTitle("⚙️ Configuración Gráfica")
         self.current_profile = current_profile or {}
+        # None = todas; si no, solo las claves que el emulador traduce a flags
+        self.supported_keys = supported_keys
         self.init_ui()
 
     def init_ui(self):
@@ -28,6 +32,12 @@ class GraphicsSettingsWindow(QDialog):
         self.fps_combo.setCurrentText(str(self.current_profile.get("fps_limit", 60)))
         form.addRow("Límite de FPS:", self.fps_combo)
         
+        for key, combo in (("resolution", self.resolution_combo), ("textures", self.texture_combo),
+                           ("fps_limit", self.fps_combo)):
+            if self.supported_keys is not None and key not in self.supported_keys:
+                combo.setEnabled(False)
+                combo.setToolTip(UNSUPPORTED_TOOLTIP)
+
         layout.addLayout(form)
         
         save_btn = QPushButton("Guardar")
@@ -1,23 +1,37 @@
 # ui/main_window.py
 from PyQt5.QtWidgets import (
-    QMainWindow, QWidget, QGridLayout, QLabel, QPushButton,
-    QScrollArea, QVBoxLayout, QHBoxLayout, QMenuBar, QAction, QMessageBox, 
-    QListWidget, QListWidgetItem, QToolButton, QApplication, QInputDialog
+    QMainWindow, QDialog, QWidget, QLabel, QPushButton,
+    QVBoxLayout, QHBoxLayout, QMenuBar, QAction, QMessageBox, 
+    QListWidget, QListWidgetItem, QApplication, QInputDialog
 )
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QPixmap
-from core.game_scanner import scan_games
+from PyQt5.QtCore import Qt, QTimer, QEvent, pyqtSignal
+from PyQt5.QtGui import QPixmapCache
+from core.library_watcher import LibraryWatcher, WATCHER_ENABLED
 from ui.settings_window import SettingsWindow
-from utils.cover_finder import find_cover
+from ui.scan_worker import ScanWorker
+from ui.game_grid import GameListModel, GameCardDelegate, create_game_view, GAME_ID_ROLE
+from ui.navigation import NavigationIndex
+from utils.thumbnail_cache import ThumbnailService
+from core.emulator_manager import prefetch_game, invalidate_launch_cache, tracker
+from core.emulator_profiles import supported_settings
+from core.process_policy import LAUNCHER_THROTTLE_ENABLED
 from ui.theme_manager import apply_theme
 from utils.gamepad_manager import GamepadManager
 from utils.license_manager import is_license_valid, get_machine_id
 from utils.fps_overlay import FPSOverlay
-import sqlite3
+from database.connection import get_connection
 import os
 import requests
 
+# Modo reposo mientras hay una partida abierta; minimizar la ventana es opcional
+IDLE_MODE_ENABLED = os.getenv("MULTIVERSE_IDLE_MODE", "1") == "1"
+IDLE_MINIMIZE = os.getenv("MULTIVERSE_IDLE_MINIMIZE", "0") == "1"
+
 class MultiverseMainWindow(QMainWindow):
+    # Emitida desde el hilo del watcher: (console_id, cambios) o (None, None) tras un reescaneo completo
+    library_changed = pyqtSignal(object, object)
+    session_event = pyqtSignal(str, object)
+
     def __init__(self, user_token=None, lang="es"):
         super().__init__()
         self.lang = lang
@@ -41,7 +55,14 @@ class MultiverseMainWindow(QMainWindow):
                 "hardware": "Hardware",
                 "view_hardware": "Ver hardware",
                 "logout": "Cerrar Sesion",
-                "cancel_subscription": "Cancelar Suscripcion"
+                "cancel_subscription": "Cancelar Suscripcion",
+                "scanning": "Escaneando {console}...",
+                "scan_progress": "Escaneando {console}: {count} juegos",
+                "scan_done": "Biblioteca actualizada: {added} nuevos, {removed} eliminados, {updated} modificados.",
+                "scan_cancelled": "Escaneo cancelado.",
+                "scan_failed": "Error al escanear: {error}",
+                "cancel": "Cancelar",
+                "emulator_busy": "Ya hay {count} juego(s) en ejecución.\nCierra uno antes de iniciar otro."
             },
             "en": {
                 "app_title": "Multiverse Gamer Emulator",
@@ -62,7 +83,14 @@ class MultiverseMainWindow(QMainWindow):
                 "hardware": "Hardware",
                 "view_hardware": "View Hardware",
                 "logout": "Logout",
-                "cancel_subscription": "Cancel Subscription"
+                "cancel_subscription": "Cancel Subscription",
+                "scanning": "Scanning {console}...",
+                "scan_progress": "Scanning {console}: {count} games",
+                "scan_done": "Library updated: {added} new, {removed} removed, {updated} changed.",
+                "scan_cancelled": "Scan cancelled.",
+                "scan_failed": "Scan error: {error}",
+                "cancel": "Cancel",
+                "emulator_busy": "{count} game(s) already running.\nClose one before starting another."
             }
         }
         self.setWindowTitle(self.translations[self.lang]["app_title"])
@@ -72,16 +100,39 @@ class MultiverseMainWindow(QMainWindow):
         self.current_theme = "Oscuro"
         self.selected_game_id = None
         self.user_token = user_token
+        self.scan_worker = None
+        self.rescan_requested = False
+        self.background_paused = False
+        self.scan_deferred = False
+        self.idle_mode = False
+        self.idle_restore_pending = False
+        self.idle_selected_game = None
         self.fps_overlay = FPSOverlay(self)
         if not is_license_valid():
             print("⚠️ Licencia no valida, pero continuando en modo prueba.")
         self.theme = apply_theme(QApplication.instance(), self.current_theme)
         self.init_ui()
-        scan_games()
         self.load_consoles_sidebar()
         self.load_games()
+        self.start_scan()
         self.gamepad = GamepadManager()
+        self.gamepad.dpad_up.connect(lambda: self.navigate("up"))
+        self.gamepad.dpad_down.connect(lambda: self.navigate("down"))
+        self.gamepad.dpad_left.connect(lambda: self.navigate("left"))
+        self.gamepad.dpad_right.connect(lambda: self.navigate("right"))
+        self.gamepad.button_a.connect(self.play_selected)
+        self.gamepad.button_b.connect(self.exit_big_picture)
         self.gamepad.start()
+        self.library_watcher = None
+        self.library_changed.connect(self.apply_library_changes)
+        if WATCHER_ENABLED:
+            self.library_watcher = LibraryWatcher(on_change=self.library_changed.emit)
+            self.library_watcher.start()
+        # Los eventos de fin de sesión llegan desde el hilo de la sesión; la señal los pasa al de la UI.
+        # En cola también para "started", así pausar el fondo no demora el lanzamiento.
+        self.session_event.connect(self.on_session_event, Qt.QueuedConnection)
+        self._session_listener = self.session_event.emit
+        tracker.add_listener(self._session_listener)
         if self.user_token:
             self.validate_online_license()
 
@@ -132,13 +183,156 @@ class MultiverseMainWindow(QMainWindow):
         main_layout.addWidget(self.sidebar)
         right_layout = QVBoxLayout()
         main_layout.addLayout(right_layout)
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        self.grid_widget = QWidget()
-        self.grid_layout = QGridLayout(self.grid_widget)
-        self.grid_layout.setAlignment(Qt.AlignTop)
-        scroll.setWidget(self.grid_widget)
-        right_layout.addWidget(scroll)
+        self.game_model = GameListModel(self)
+        self.thumbnails = ThumbnailService(self)
+        self.card_delegate = GameCardDelegate(self.theme, self.tr("play"), self.thumbnails, self)
+        self.card_delegate.favorite_clicked.connect(self.toggle_favorite)
+        self.card_delegate.play_clicked.connect(self.launch_game_by_id)
+        self.card_delegate.config_clicked.connect(self.open_graphics_settings)
+        self.game_view = create_game_view()
+        self.game_view.setModel(self.game_model)
+        self.nav_index = NavigationIndex(self.game_model)
+        # Flechas, página y letras van al índice de navegación en vez de la búsqueda lineal de QListView
+        self.game_view.installEventFilter(self)
+        self.game_view.setItemDelegate(self.card_delegate)
+        self.game_view.activated.connect(lambda index: self.launch_game_by_id(index.data(GAME_ID_ROLE)))
+        self.thumbnails.thumbnail_ready.connect(lambda _: self.game_view.viewport().update())
+        # Precargar el juego bajo el mouse o con el foco para acortar el arranque
+        self.game_view.entered.connect(self.prefetch_index)
+        self.game_view.selectionModel().currentChanged.connect(lambda current, _: self.prefetch_index(current))
+        right_layout.addWidget(self.game_view)
+        self.placeholder = QLabel(self.tr("no_games"))
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.placeholder.hide()
+        right_layout.addWidget(self.placeholder)
+        self.update_grid_style()
+        self.scan_cancel_btn = QPushButton(self.tr("cancel"))
+        self.scan_cancel_btn.clicked.connect(self.cancel_scan)
+        self.scan_cancel_btn.hide()
+        self.statusBar().addPermanentWidget(self.scan_cancel_btn)
+
+    def start_scan(self):
+        """Escanea la biblioteca en segundo plano; la grilla se actualiza al terminar cada consola."""
+        if self.background_paused:
+            # Hay una partida en curso: escanear cuando termine
+            self.scan_deferred = True
+            return
+        if self.scan_worker and self.scan_worker.isRunning():
+            # Reiniciar cuando termine la consola en curso
+            self.rescan_requested = True
+            self.scan_worker.cancel()
+            return
+        self.rescan_requested = False
+        self.scan_worker = ScanWorker(self)
+        self.scan_worker.console_started.connect(
+            lambda console: self.statusBar().showMessage(self.tr("scanning").format(console=console))
+        )
+        self.scan_worker.batch_progress.connect(
+            lambda console, count: self.statusBar().showMessage(self.tr("scan_progress").format(console=console, count=count))
+        )
+        self.scan_worker.console_finished.connect(self.on_console_scanned)
+        self.scan_worker.scan_finished.connect(self.on_scan_finished)
+        self.scan_worker.scan_failed.connect(
+            lambda error: self.statusBar().showMessage(self.tr("scan_failed").format(error=error), 10000)
+        )
+        # finished llega cuando el hilo ya terminó: recién ahí se puede reiniciar el escaneo
+        self.scan_worker.finished.connect(self.on_scan_thread_finished)
+        self.scan_worker.finished.connect(self.scan_worker.deleteLater)
+        self.scan_cancel_btn.show()
+        self.scan_worker.start()
+
+    def cancel_scan(self):
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.rescan_requested = False
+            self.scan_worker.cancel()
+
+    def on_console_scanned(self, console_id, name, result):
+        if not (result["added"] or result["removed"] or result["updated"] or result["covers"]):
+            return
+        if self.current_console_filter is None or self.current_console_filter == console_id:
+            self.load_games()
+
+    def on_scan_finished(self, totals):
+        if self.rescan_requested:
+            return
+        if totals.get("cancelled"):
+            self.statusBar().showMessage(self.tr("scan_cancelled"), 5000)
+        else:
+            self.statusBar().showMessage(self.tr("scan_done").format(**totals), 5000)
+
+    def on_scan_thread_finished(self):
+        if self.sender() is not self.scan_worker:
+            # Un escaneo anterior que terminó después de reemplazarlo
+            return
+        self.scan_worker = None
+        self.scan_cancel_btn.hide()
+        if self.rescan_requested:
+            self.start_scan()
+
+    def on_session_event(self, event, session):
+        if event == "started":
+            if LAUNCHER_THROTTLE_ENABLED and not self.background_paused:
+                self.pause_background_work()
+            if IDLE_MODE_ENABLED and not self.idle_mode:
+                self.enter_idle_mode()
+        elif event == "ended" and not tracker.running_sessions():
+            if self.background_paused:
+                self.resume_background_work()
+            if self.idle_mode:
+                # Restaurar cuando el usuario vuelva al launcher, no apenas se cierra el emulador
+                self.idle_restore_pending = True
+                if self.isActiveWindow() and not self.isMinimized():
+                    self.leave_idle_mode()
+
+    def enter_idle_mode(self):
+        """Libera carátulas y filas de la grilla y deja de atender el gamepad mientras se juega."""
+        self.idle_mode = True
+        current = self.game_view.currentIndex()
+        self.idle_selected_game = current.data(GAME_ID_ROLE) if current.isValid() else None
+        self.gamepad.pause()
+        self.game_view.setUpdatesEnabled(False)
+        self.game_model.set_games([])
+        self.thumbnails.clear()
+        QPixmapCache.clear()
+        if IDLE_MINIMIZE:
+            self.showMinimized()
+
+    def leave_idle_mode(self):
+        self.idle_mode = False
+        self.idle_restore_pending = False
+        self.game_view.setUpdatesEnabled(True)
+        self.load_games()
+        row = self.game_model.row_for_id(self.idle_selected_game)
+        if row is not None:
+            index = self.game_model.index(row)
+            self.game_view.setCurrentIndex(index)
+            self.game_view.scrollTo(index)
+        self.gamepad.resume()
+
+    def changeEvent(self, event):
+        # getattr: Qt ya envía eventos desde super().__init__(), antes de crear el atributo
+        if (getattr(self, "idle_restore_pending", False) and event.type() in (QEvent.ActivationChange, QEvent.WindowStateChange)
+                and self.isActiveWindow() and not self.isMinimized()):
+            QTimer.singleShot(0, self.leave_idle_mode)
+            self.idle_restore_pending = False
+        super().changeEvent(event)
+
+    def pause_background_work(self):
+        """Detiene el watcher y el escaneo mientras se juega para no competir con el emulador."""
+        self.background_paused = True
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.scan_deferred = True
+            self.cancel_scan()
+        if self.library_watcher:
+            self.library_watcher.stop()
+
+    def resume_background_work(self):
+        self.background_paused = False
+        if self.library_watcher:
+            self.library_watcher.start()
+        if self.scan_deferred:
+            self.scan_deferred = False
+            self.start_scan()
 
     def update_sidebar_style(self):
         self.sidebar.setStyleSheet(f"""
@@ -157,6 +351,15 @@ class MultiverseMainWindow(QMainWindow):
             }}
         """)
 
+    def update_grid_style(self):
+        self.game_view.setStyleSheet(f"QListView {{ background-color: {self.theme['main_bg']}; }}")
+        self.placeholder.setStyleSheet(f"color: {self.theme['text_secondary']}; font-size: 16px;")
+        self.card_delegate.theme = self.theme
+        self.card_delegate.play_text = self.tr("play")
+        self.card_delegate.is_big_picture = self.is_big_picture
+        # Las tarjetas cambian de tamaño: recalcular la disposición de la vista sin tocar el modelo
+        self.game_view.scheduleDelayedItemsLayout()
+
     def toggle_big_picture(self):
         self.is_big_picture = not self.is_big_picture
         if self.is_big_picture:
@@ -164,18 +367,17 @@ class MultiverseMainWindow(QMainWindow):
         else:
             self.showNormal()
         self.update_sidebar_style()
-        self.load_games()
+        self.update_grid_style()
 
     def load_consoles_sidebar(self):
         self.sidebar.clear()
         all_item = QListWidgetItem("🎮 " + self.tr("favorites"))
         all_item.setData(Qt.UserRole, None)
         self.sidebar.addItem(all_item)
-        conn = sqlite3.connect("database/multiverse.db")
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT id, name FROM consoles ORDER BY name")
         consoles = cursor.fetchall()
-        conn.close()
         for console_id, name in consoles:
             item = QListWidgetItem(f"🕹️ {name}")
             item.setData(Qt.UserRole, console_id)
@@ -188,99 +390,60 @@ class MultiverseMainWindow(QMainWindow):
         self.load_games()
 
     def load_games(self):
-        while self.grid_layout.count():
-            child = self.grid_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-        conn = sqlite3.connect("database/multiverse.db")
+        if self.idle_mode:
+            # Se recarga al salir del modo reposo
+            return
+        conn = get_connection()
         cursor = conn.cursor()
         if self.current_console_filter is None:
             cursor.execute("""
-                SELECT g.id, g.title, c.name, g.is_favorite, g.path
+                SELECT g.id, g.title, c.name, g.is_favorite, g.path, g.cover_path
                 FROM games g 
                 JOIN consoles c ON g.console_id = c.id
+                ORDER BY g.id
             """)
         else:
             cursor.execute("""
-                SELECT g.id, g.title, c.name, g.is_favorite, g.path
+                SELECT g.id, g.title, c.name, g.is_favorite, g.path, g.cover_path
                 FROM games g 
                 JOIN consoles c ON g.console_id = c.id
                 WHERE c.id = ?
+                ORDER BY g.id
             """, (self.current_console_filter,))
-        games = cursor.fetchall()
-        conn.close()
-        if not games:
-            placeholder = QLabel(self.tr("no_games"))
-            placeholder.setAlignment(Qt.AlignCenter)
-            placeholder.setStyleSheet(f"color: {self.theme['text_secondary']}; font-size: 16px;")
-            self.grid_layout.addWidget(placeholder, 0, 0)
-        else:
-            for i, (game_id, title, console, is_favorite, path) in enumerate(games):
-                cover_path = find_cover(path, console)
-                card = self.create_game_card(title, console, game_id, bool(is_favorite), cover_path)
-                row = i // (2 if self.is_big_picture else 5)
-                col = i % (2 if self.is_big_picture else 5)
-                self.grid_layout.addWidget(card, row, col)
-
-    def create_game_card(self, title, console, game_id, is_favorite, cover_path):
-        card_width = 400 if self.is_big_picture else 200
-        card_height = 500 if self.is_big_picture else 300
-        card = QWidget()
-        card.setFixedSize(card_width, card_height)
-        card.setStyleSheet(f"background-color: {self.theme['card_bg']}; border-radius: 10px;")
-        card.setFocusPolicy(Qt.StrongFocus)
-        card.game_id = game_id
-        layout = QVBoxLayout(card)
-        layout.setAlignment(Qt.AlignTop)
-        fav_btn = QToolButton()
-        fav_btn.setFixedSize(30 if self.is_big_picture else 24, 30 if self.is_big_picture else 24)
-        self.update_favorite_icon(fav_btn, is_favorite)
-        fav_btn.clicked.connect(lambda _, gid=game_id, btn=fav_btn: self.toggle_favorite(gid, btn))
-        layout.addWidget(fav_btn, alignment=Qt.AlignRight)
-        cover_label = QLabel()
-        cover_size = 360 if self.is_big_picture else 180
-        cover_label.setFixedSize(cover_size, cover_size)
-        if cover_path and os.path.exists(cover_path):
-            pixmap = QPixmap(cover_path).scaled(
-                cover_size, cover_size, Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
-            cover_label.setPixmap(pixmap)
-        else:
-            cover_label.setStyleSheet(f"background-color: #444; border-radius: 8px;")
-        layout.addWidget(cover_label, alignment=Qt.AlignCenter)
-        title_label = QLabel(title[:30] + "..." if len(title) > 30 else title)
-        title_label.setStyleSheet(f"color: {self.theme['text']}; font-size: {'24px' if self.is_big_picture else '14px'}; font-weight: bold;")
-        title_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(title_label)
-        console_label = QLabel(console)
-        console_label.setStyleSheet(f"color: {self.theme['text_secondary']}; font-size: {'18px' if self.is_big_picture else '12px'};")
-        console_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(console_label)
-        play_btn = QPushButton(self.tr("play"))
-        play_btn.setStyleSheet(f"""
-            background-color: {self.theme['accent']}; 
-            color: white; 
-            border-radius: 5px;
-            font-size: {'20px' if self.is_big_picture else '14px'};
-            padding: 10px;
-        """)
-        play_btn.clicked.connect(lambda _, gid=game_id: self.launch_game_by_id(gid))
-        layout.addWidget(play_btn)
-        config_btn = QPushButton("⚙️")
-        config_btn.setFixedSize(30, 30)
-        config_btn.clicked.connect(lambda _, gid=game_id: self.open_graphics_settings(gid))
-        layout.addWidget(config_btn, alignment=Qt.AlignRight | Qt.AlignTop)
-        return card
-
-    def update_favorite_icon(self, button, is_favorite):
-        icon = "★" if is_favorite else "☆"
-        color = self.theme['favorite']
-        size = "24px" if self.is_big_picture else "20px"
-        button.setText(icon)
-        button.setStyleSheet(f"color: {color}; background: transparent; border: none; font-size: {size};")
-
-    def toggle_favorite(self, game_id, button):
-        conn = sqlite3.connect("database/multiverse.db")
+        self.game_model.set_games(cursor.fetchall())
+        self.update_placeholder()
+
+    def update_placeholder(self):
+        has_games = self.game_model.rowCount() > 0
+        self.game_view.setVisible(has_games)
+        self.placeholder.setVisible(not has_games)
+
+    def apply_library_changes(self, console_id, changes):
+        """Aplica los cambios del watcher quitando o insertando solo las filas afectadas."""
+        if self.idle_mode:
+            return
+        if changes is None:
+            self.load_games()
+            return
+        if self.current_console_filter is not None and self.current_console_filter != console_id:
+            return
+        refreshed = changes["updated"] + changes.get("covers", [])
+        self.game_model.remove_ids(changes["removed"] + refreshed)
+        new_ids = changes["added"] + refreshed
+        if new_ids:
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT g.id, g.title, c.name, g.is_favorite, g.path, g.cover_path
+                FROM games g
+                JOIN consoles c ON g.console_id = c.id
+                WHERE g.id IN ({",".join("?" * len(new_ids))})
+            """, new_ids)
+            self.game_model.add_rows(cursor.fetchall())
+        self.update_placeholder()
+
+    def toggle_favorite(self, game_id):
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT is_favorite FROM games WHERE id = ?", (game_id,))
         current = cursor.fetchone()
@@ -288,15 +451,21 @@ class MultiverseMainWindow(QMainWindow):
             new_state = not bool(current[0])
             cursor.execute("UPDATE games SET is_favorite = ? WHERE id = ?", (int(new_state), game_id))
             conn.commit()
-            self.update_favorite_icon(button, new_state)
-        conn.close()
+            self.game_model.set_favorite(game_id, new_state)
+
+    def prefetch_index(self, index):
+        if index.isValid():
+            prefetch_game(index.data(GAME_ID_ROLE))
 
     def launch_game_by_id(self, game_id):
-        from core.emulator_manager import launch_game
-        success = launch_game(game_id)
-        if success:
+        from core.emulator_manager import supervisor
+        session, status = supervisor.launch(game_id)
+        if status == "started":
+            self.fps_overlay.set_session(session)
             QTimer.singleShot(2000, self.fps_overlay.toggle)
-        else:
+        elif status == "busy":
+            QMessageBox.information(self, "Info", self.tr("emulator_busy").format(count=len(supervisor.running_sessions())))
+        elif status == "failed":
             QMessageBox.warning(self, "Error", "No se pudo iniciar el juego.\nVerifica las rutas en Configuracion.")
 
     def open_settings(self):
@@ -307,8 +476,12 @@ class MultiverseMainWindow(QMainWindow):
             self.lang = settings.selected_lang
             self.theme = apply_theme(QApplication.instance(), self.current_theme)
             self.update_sidebar_style()
-            scan_games()
+            self.update_grid_style()
+            invalidate_launch_cache()
             self.load_games()
+            self.start_scan()
+            if self.library_watcher and not self.background_paused:
+                self.library_watcher.restart()
 
     def open_subscription(self):
         email, ok = QInputDialog.getText(self, "Suscripcion", "Email:")
@@ -334,57 +507,97 @@ class MultiverseMainWindow(QMainWindow):
         QMessageBox.information(self, "💻 Informacion de Hardware", message)
 
     def open_graphics_settings(self, game_id):
-        import sqlite3
         import json
-        conn = sqlite3.connect("database/multiverse.db")
+        conn = get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT graphics_profile FROM games WHERE id = ?", (game_id,))
+        cursor.execute("""
+            SELECT g.graphics_profile, c.name, c.emulator_path
+            FROM games g
+            LEFT JOIN consoles c ON g.console_id = c.id
+            WHERE g.id = ?
+        """, (game_id,))
         result = cursor.fetchone()
-        conn.close()
         current_profile = json.loads(result[0]) if result and result[0] else {}
+        supported_keys = supported_settings(result[1], result[2]) if result else ()
         from ui.graphics_settings_window import GraphicsSettingsWindow
-        dialog = GraphicsSettingsWindow(self, current_profile)
+        dialog = GraphicsSettingsWindow(self, current_profile, supported_keys)
         if dialog.exec_() == QDialog.Accepted:
             new_profile = dialog.get_profile()
-            conn = sqlite3.connect("database/multiverse.db")
+            conn = get_connection()
             cursor = conn.cursor()
             cursor.execute("UPDATE games SET graphics_profile = ? WHERE id = ?", (json.dumps(new_profile), game_id))
             conn.commit()
-            conn.close()
+            invalidate_launch_cache(game_id)
             QMessageBox.information(self, "Exito", "Configuracion grafica guardada.")
 
+    def closeEvent(self, event):
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.cancel_scan()
+            self.scan_worker.wait()
+        if self.library_watcher:
+            self.library_watcher.stop()
+        tracker.remove_listener(self._session_listener)
+        self.gamepad.stop()
+        super().closeEvent(event)
+
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Escape and self.is_big_picture:
             self.toggle_big_picture()
-        else:
+        elif not self.handle_navigation_key(event):
             super().keyPressEvent(event)
 
+    def eventFilter(self, obj, event):
+        if obj is self.game_view and event.type() == QEvent.KeyPress and self.handle_navigation_key(event):
+            return True
+        return super().eventFilter(obj, event)
+
+    def handle_navigation_key(self, event):
+        key = event.key()
+        arrows = {Qt.Key_Left: "left", Qt.Key_Right: "right", Qt.Key_Up: "up", Qt.Key_Down: "down"}
+        if key in arrows:
+            self.navigate(arrows[key])
+        elif key in (Qt.Key_PageUp, Qt.Key_PageDown):
+            self._sync_navigation_layout()
+            self.select_game(self.nav_index.page(self.current_game_id(), -1 if key == Qt.Key_PageUp else 1))
+        elif event.text().isalnum() and not event.modifiers() & (Qt.ControlModifier | Qt.AltModifier):
+            self.select_game(self.nav_index.jump_to_letter(self.current_game_id(), event.text()))
+        else:
+            return False
+        return True
+
+    def _sync_navigation_layout(self):
+        viewport = self.game_view.viewport()
+        self.nav_index.update_layout(viewport.width(), viewport.height(), self.game_view.sizeHintForIndex(
+            self.game_model.index(0)) if self.game_model.rowCount() else viewport.size())
+
+    def current_game_id(self):
+        current = self.game_view.currentIndex()
+        return current.data(GAME_ID_ROLE) if current.isValid() else None
+
+    def navigate(self, direction):
+        """Mueve la selección a la tarjeta vecina (d-pad del gamepad o teclado)."""
+        self._sync_navigation_layout()
+        self.select_game(self.nav_index.neighbour(self.current_game_id(), direction))
+
+    def select_game(self, game_id):
+        row = self.game_model.row_for_id(game_id)
+        if row is None:
+            return
+        index = self.game_model.index(row)
+        self.game_view.setCurrentIndex(index)
+        self.game_view.scrollTo(index)
+        self.game_view.setFocus()
+
     def focus_previous(self):
-        widgets = [self.grid_layout.itemAt(i).widget() for i in range(self.grid_layout.count())]
-        widgets = [w for w in widgets if w]
-        current = self.grid_widget.focusWidget()
-        if current in widgets:
-            idx = widgets.index(current)
-            if idx > 0:
-                widgets[idx - 1].setFocus()
-        elif widgets:
-            widgets[0].setFocus()
+        self.navigate("left")
 
     def focus_next(self):
-        widgets = [self.grid_layout.itemAt(i).widget() for i in range(self.grid_layout.count())]
-        widgets = [w for w in widgets if w]
-        current = self.grid_widget.focusWidget()
-        if current in widgets:
-            idx = widgets.index(current)
-            if idx < len(widgets) - 1:
-                widgets[idx + 1].setFocus()
-        elif widgets:
-            widgets[0].setFocus()
+        self.navigate("right")
 
     def play_selected(self):
-        current = self.grid_widget.focusWidget()
-        if current and hasattr(current, 'game_id'):
-            self.launch_game_by_id(current.game_id)
+        current = self.game_view.currentIndex()
+        if current.isValid():
+            self.launch_game_by_id(current.data(GAME_ID_ROLE))
 
     def exit_big_picture(self):
         if self.is_big_picture:
@@ -0,0 +1,98 @@
+# ui/navigation.py
+"""
+Índice de navegación de la grilla (teclado y gamepad, sobre todo en Big Picture).
+
+Se construye una vez por contenido del modelo: posición de cada juego y, por letra
+inicial, las filas que empiezan con ella. Las columnas salen del ancho del viewport.
+Con eso cada movimiento (4 direcciones, página arriba/abajo) es aritmética sobre la
+fila, sin recorrer widgets ni índices del modelo, y funciona con la vista virtualizada.
+"""
+
+from bisect import bisect_right
+from PyQt5.QtCore import Qt
+
+DIRECTIONS = {"left": (0, -1), "right": (0, 1), "up": (-1, 0), "down": (1, 0)}
+
+
+class NavigationIndex:
+    def __init__(self, model):
+        self.model = model
+        self.columns = 1
+        self.rows_per_page = 1
+        self._rows_by_id = None
+        self._ids = []
+        self._letters = {}
+        for signal in (model.modelReset, model.rowsInserted, model.rowsRemoved, model.layoutChanged):
+            signal.connect(self.invalidate)
+        model.dataChanged.connect(self._on_data_changed)
+
+    def invalidate(self, *args):
+        self._rows_by_id = None
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        # Solo el título afecta al índice (saltar a letra)
+        if not roles or Qt.DisplayRole in roles:
+            self.invalidate()
+
+    def _ensure(self):
+        if self._rows_by_id is not None:
+            return
+        self._ids = [self.model.game_id(row) for row in range(self.model.rowCount())]
+        self._rows_by_id = {game_id: row for row, game_id in enumerate(self._ids)}
+        self._letters = {}
+        for row in range(len(self._ids)):
+            title = self.model.index(row).data(Qt.DisplayRole) or ""
+            letter = title[:1].upper()
+            if letter:
+                self._letters.setdefault(letter, []).append(row)
+
+    def update_layout(self, viewport_width, viewport_height, cell_size):
+        """Columnas y filas visibles según el viewport y el tamaño de tarjeta actuales."""
+        # QListView pasa a la fila siguiente si la tarjeta llega justo al borde
+        self.columns = max(1, (viewport_width - 1) // max(1, cell_size.width()))
+        self.rows_per_page = max(1, viewport_height // max(1, cell_size.height()))
+
+    def position(self, game_id):
+        """(fila, columna) del juego en la grilla, o None."""
+        self._ensure()
+        row = self._rows_by_id.get(game_id)
+        return None if row is None else divmod(row, self.columns)
+
+    def _clamp(self, row):
+        return min(max(row, 0), len(self._ids) - 1)
+
+    def neighbour(self, game_id, direction):
+        """Juego vecino en la dirección indicada ("left", "right", "up", "down")."""
+        self._ensure()
+        if not self._ids:
+            return None
+        row = self._rows_by_id.get(game_id)
+        if row is None:
+            return self._ids[0]
+        d_row, d_col = DIRECTIONS[direction]
+        if d_col:
+            target = row + d_col
+        else:
+            target = row + d_row * self.columns
+            # Bajar desde la penúltima fila a una última fila incompleta: ir al último juego
+            if target >= len(self._ids) and row // self.columns < (len(self._ids) - 1) // self.columns:
+                target = len(self._ids) - 1
+        return self._ids[target] if 0 <= target < len(self._ids) else game_id
+
+    def page(self, game_id, pages):
+        """Juego una o más páginas arriba (negativo) o abajo (positivo), en la misma columna."""
+        self._ensure()
+        if not self._ids:
+            return None
+        row = self._rows_by_id.get(game_id, 0)
+        return self._ids[self._clamp(row + pages * self.rows_per_page * self.columns)]
+
+    def jump_to_letter(self, game_id, letter):
+        """Siguiente juego (en orden de la grilla, circular) cuyo título empieza con la letra."""
+        self._ensure()
+        rows = self._letters.get(letter.upper())
+        if not rows:
+            return None
+        current = self._rows_by_id.get(game_id, -1)
+        i = bisect_right(rows, current)
+        return self._ids[rows[i % len(rows)]]
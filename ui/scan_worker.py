@@ -0,0 +1,54 @@
+# ui/scan_worker.py
+import threading
+from PyQt5.QtCore import QThread, pyqtSignal
+from core.game_scanner import scan_games
+from database.connection import close_connection
+
+class ScanWorker(QThread):
+    """Ejecuta scan_games() fuera del hilo de la interfaz y publica el progreso con señales."""
+    console_started = pyqtSignal(str)
+    batch_progress = pyqtSignal(str, int)
+    console_finished = pyqtSignal(int, str, dict)
+    scan_finished = pyqtSignal(dict)
+    scan_failed = pyqtSignal(str)
+
+    def __init__(self, parent=None, max_workers=None):
+        super().__init__(parent)
+        self.max_workers = max_workers
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        try:
+            totals = scan_games(
+                max_workers=self.max_workers,
+                progress=self._on_progress,
+                cancel_event=self._cancel_event
+            )
+            self.scan_finished.emit(totals)
+        except Exception as e:
+            print(f"❌ Error al escanear la biblioteca: {e}")
+            self.scan_failed.emit(str(e))
+        finally:
+            close_connection()
+
+    def _on_progress(self, event, *data):
+        # Se llama desde los hilos del escaneo; las señales llegan en cola al hilo de la UI
+        if event == "console_started":
+            self.console_started.emit(data[0])
+        elif event == "batch":
+            self.batch_progress.emit(data[0], data[1])
+        elif event == "console_finished":
+            console_id, name, result = data
+            self.console_finished.emit(console_id, name, {
+                "added": result["added"],
+                "removed": result["removed"],
+                "updated": result["updated"],
+                "covers": result["covers"],
+                "unchanged": result["unchanged"]
+            })
@@ -5,7 +5,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 from ui.theme_manager import THEMES
-import sqlite3
+from database.connection import get_connection
 import os
 
 class SettingsWindow(QDialog):
@@ -113,11 +113,9 @@ class SettingsWindow(QDialog):
         self.selected_theme = theme_name
 
     def load_settings(self):
-        conn = sqlite3.connect("database/multiverse.db")
-        cursor = conn.cursor()
+        cursor = get_connection().cursor()
         cursor.execute("SELECT id, name, roms_path, emulator_path FROM consoles ORDER BY name")
         consoles = cursor.fetchall()
-        conn.close()
 
         row = 0
         for console_id, name, roms_path, emulator_path in consoles:
@@ -169,7 +167,7 @@ class SettingsWindow(QDialog):
             line_edit.setText(file)
 
     def save_settings(self):
-        conn = sqlite3.connect("database/multiverse.db")
+        conn = get_connection()
         cursor = conn.cursor()
         try:
             for console_id, fields in self.fields.items():
@@ -191,8 +189,6 @@ class SettingsWindow(QDialog):
         except Exception as e:
             conn.rollback()
             QMessageBox.critical(self, "Error", self.tr("error_save").format(error=str(e)))
-        finally:
-            conn.close()
 
     def activate_trial(self):
         from utils.license_manager import save_license
@@ -1,58 +1,71 @@
 # ui/stats_window.py
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem
-import sqlite3
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTabWidget, QTableWidget, QTableWidgetItem
+from core.stats_manager import top_games, console_totals, weekly_totals, heaviest_games
 
 class StatsWindow(QDialog):
     def __init__(self, parent=None, lang="es"):
         super().__init__(parent)
         self.lang = lang
         self.translations = {
-            "es": {"title": "📊 Estadísticas", "games_played": "Juegos más jugados", "total_hours": "Horas totales"},
-            "en": {"title": "📊 Statistics", "games_played": "Most Played Games", "total_hours": "Total Hours"}
+            "es": {"title": "📊 Estadísticas", "games_played": "Juegos más jugados", "total_hours": "Horas totales",
+                   "times_played": "Veces jugado", "by_console": "Por consola", "console": "Consola",
+                   "by_week": "Por semana", "week": "Semana", "sessions": "Sesiones",
+                   "performance": "Rendimiento", "avg_cpu": "CPU prom. %", "peak_cpu": "CPU pico %",
+                   "peak_ram": "RAM pico (GB)"},
+            "en": {"title": "📊 Statistics", "games_played": "Most Played Games", "total_hours": "Total Hours",
+                   "times_played": "Times Played", "by_console": "By Console", "console": "Console",
+                   "by_week": "By Week", "week": "Week", "sessions": "Sessions",
+                   "performance": "Performance", "avg_cpu": "Avg CPU %", "peak_cpu": "Peak CPU %",
+                   "peak_ram": "Peak RAM (GB)"}
         }
-        self.setWindowTitle(self.translations[self.lang]["title"])
+        self.setWindowTitle(self.tr("title"))
         self.setFixedSize(600, 400)
         self.init_ui()
 
+    def tr(self, key):
+        return self.translations[self.lang].get(key, key)
+
     def init_ui(self):
         layout = QVBoxLayout(self)
-        layout.addWidget(QLabel(self.translations[self.lang]["games_played"] + ":"))
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels([
-            self.translations[self.lang]["games_played"],
-            "Veces jugado",
-            self.translations[self.lang]["total_hours"]
-        ])
-        layout.addWidget(self.table)
+        self.tabs = QTabWidget()
+        self.table = self._create_table([self.tr("games_played"), self.tr("times_played"), self.tr("total_hours")])
+        self.console_table = self._create_table([self.tr("console"), self.tr("sessions"), self.tr("total_hours")])
+        self.week_table = self._create_table([self.tr("week"), self.tr("sessions"), self.tr("total_hours")])
+        self.perf_table = self._create_table([self.tr("games_played"), self.tr("avg_cpu"),
+                                              self.tr("peak_cpu"), self.tr("peak_ram")])
+        self.tabs.addTab(self.table, self.tr("games_played"))
+        self.tabs.addTab(self.console_table, self.tr("by_console"))
+        self.tabs.addTab(self.week_table, self.tr("by_week"))
+        self.tabs.addTab(self.perf_table, self.tr("performance"))
+        layout.addWidget(self.tabs)
         self.load_stats()
 
+    def _create_table(self, headers):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        return table
+
+    def _fill_table(self, table, rows):
+        table.setRowCount(len(rows))
+        for row, (name, count, seconds) in enumerate(rows):
+            table.setItem(row, 0, QTableWidgetItem(name))
+            table.setItem(row, 1, QTableWidgetItem(str(count)))
+            table.setItem(row, 2, QTableWidgetItem(f"{seconds / 3600:.1f}"))
+
     def load_stats(self):
+        """Lee los acumulados que se actualizan al cerrar cada sesión."""
         try:
-            conn = sqlite3.connect("database/multiverse.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS game_stats (
-                game_id INTEGER PRIMARY KEY,
-                play_count INTEGER DEFAULT 0,
-                total_time INTEGER DEFAULT 0,
-                last_played TIMESTAMP
-            )""")
-            cursor.execute("""
-                SELECT g.title, s.play_count, s.total_time
-                FROM game_stats s
-                JOIN games g ON s.game_id = g.id
-                ORDER BY s.total_time DESC
-                LIMIT 10
-            """)
-            stats = cursor.fetchall()
-            conn.close()
-            self.table.setRowCount(len(stats))
-            for row, (title, count, seconds) in enumerate(stats):
-                hours = seconds // 3600
-                self.table.setItem(row, 0, QTableWidgetItem(title))
-                self.table.setItem(row, 1, QTableWidgetItem(str(count)))
-                self.table.setItem(row, 2, QTableWidgetItem(str(hours)))
+            self._fill_table(self.table, top_games(10))
+            self._fill_table(self.console_table, console_totals())
+            self._fill_table(self.week_table, weekly_totals(12)[::-1])
+            heaviest = heaviest_games(10)
+            self.perf_table.setRowCount(len(heaviest))
+            for row, (title, _, avg_cpu, peak_cpu, peak_rss) in enumerate(heaviest):
+                self.perf_table.setItem(row, 0, QTableWidgetItem(title))
+                self.perf_table.setItem(row, 1, QTableWidgetItem(f"{avg_cpu:.0f}"))
+                self.perf_table.setItem(row, 2, QTableWidgetItem(f"{peak_cpu:.0f}"))
+                self.perf_table.setItem(row, 3, QTableWidgetItem(f"{peak_rss / (1024 ** 3):.2f}"))
         except Exception as e:
             print(f"Error al cargar estadísticas: {e}")
-            self.table.setRowCount(0)
\ No newline at end of file
+            self.table.setRowCount(0)
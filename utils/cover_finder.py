@@ -2,33 +2,67 @@
 import os
 from pathlib import Path
 
-def find_cover(game_path: str, console_name: str) -> str:
+# Nombres y extensiones de carátula, en orden de prioridad
+COVER_NAMES = ("cover", "boxart", "front", "fanart")
+COVER_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+# Consolas cuya carátula va dentro de la carpeta del juego
+FOLDER_CONSOLES = ("PS1", "PS3", "WiiU")
+
+def cover_dir(game_path: str, console_name: str, is_dir=None) -> str:
     """
-    Busca una carátula para el juego.
-    - Para PS1, PS3, WiiU: busca en la carpeta del juego.
-    - Para otros: busca en la misma carpeta que el archivo.
+    Carpeta donde se busca la carátula.
+    - Para PS1, PS3, WiiU: la carpeta del juego.
+    - Para otros: la misma carpeta que el archivo.
     """
-    game_path = Path(game_path)
-    
-    # Definir dónde buscar según la consola
-    if console_name in ("PS1", "PS3", "WiiU"):
-        # game_path es una carpeta → buscar dentro
-        search_dir = game_path if game_path.is_dir() else game_path.parent
-    else:
-        # game_path es un archivo → buscar en su carpeta
-        search_dir = game_path.parent
+    if console_name in FOLDER_CONSOLES:
+        if is_dir is None:
+            is_dir = os.path.isdir(game_path)
+        if is_dir:
+            return str(game_path)
+    return os.path.dirname(str(game_path))
+
+def pick_cover(folder: str, names) -> str:
+    """Elige la carátula a partir del listado de una carpeta (sin un stat por candidato)."""
+    by_lower = {name.lower(): name for name in names}
+    for name in COVER_NAMES:
+        for ext in COVER_EXTS:
+            match = by_lower.get(name + ext)
+            if match:
+                return os.path.join(folder, match)
+    return ""
 
-    if not search_dir.exists():
+def find_cover(game_path: str, console_name: str) -> str:
+    """Busca una carátula para el juego con un único listado de su carpeta."""
+    search_dir = cover_dir(str(Path(game_path)), console_name)
+    try:
+        return pick_cover(search_dir, os.listdir(search_dir))
+    except OSError:
         return ""
 
-    # Extensiones comunes de carátulas
-    cover_names = ["cover", "boxart", "front", "fanart"]
-    cover_exts = [".png", ".jpg", ".jpeg", ".webp"]
+class CoverResolver:
+    """
+    Resuelve las carátulas de un escaneo: un stat y, como mucho, un listado por carpeta.
+    known = {carpeta: (mtime, carátula)} de escaneos anteriores; si el mtime de la
+    carpeta no cambió se reutiliza la carátula guardada sin listar la carpeta.
+    """
 
-    for name in cover_names:
-        for ext in cover_exts:
-            cover_path = search_dir / (name + ext)
-            if cover_path.exists():
-                return str(cover_path)
+    def __init__(self, known=None):
+        self.known = known or {}
+        self._folders = {}
 
-    return ""
\ No newline at end of file
+    def resolve(self, game_path: str, console_name: str, is_dir=None):
+        """Devuelve (carátula, mtime de la carpeta); mtime es None si la carpeta no es accesible."""
+        folder = cover_dir(game_path, console_name, is_dir)
+        result = self._folders.get(folder)
+        if result is None:
+            try:
+                mtime = os.stat(folder).st_mtime_ns
+                known = self.known.get(folder)
+                if known and known[0] == mtime:
+                    result = (known[1] or "", mtime)
+                else:
+                    result = (pick_cover(folder, os.listdir(folder)), mtime)
+            except OSError:
+                result = ("", None)
+            self._folders[folder] = result
+        return result
@@ -1,38 +1,50 @@
 # utils/fps_overlay.py
-from PyQt5.QtWidgets import QLabel, QApplication
+from PyQt5.QtWidgets import QLabel
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
-import time
 
 class FPSOverlay(QLabel):
+    """
+    Overlay de rendimiento de la partida en curso: CPU, RAM e IO del emulador,
+    tomados del ResourceSampler de la sesión. El temporizador solo corre visible.
+    """
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
         self.setFont(QFont("Arial", 16, QFont.Bold))
         self.setStyleSheet("color: yellow; background-color: rgba(0,0,0,100); padding: 5px;")
-        self.fps = 0
-        self.frame_count = 0
-        self.last_time = time.time()
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_fps)
-        self.timer.start(1000)
+        self.session = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_stats)
         self.hide()
 
-    def count_frame(self):
-        self.frame_count += 1
+    def set_session(self, session):
+        self.session = session
+        self.setText("CPU --  ·  RAM --")
+
+    def update_stats(self):
+        if self.session is None or not self.session.is_running:
+            self.hide()
+            return
+        sample = self.session.sampler.latest() if self.session.sampler else None
+        if sample is None:
+            return
+        io_rate = (sample["read_rate"] + sample["write_rate"]) / (1024 ** 2)
+        self.setText(f"CPU {sample['cpu']:.0f}%  ·  RAM {sample['rss'] / (1024 ** 3):.2f} GB  ·  IO {io_rate:.1f} MB/s")
+        self.adjustSize()
+
+    def showEvent(self, event):
+        self.timer.start(1000)
+        super().showEvent(event)
 
-    def update_fps(self):
-        current_time = time.time()
-        elapsed = current_time - self.last_time
-        if elapsed > 0:
-            self.fps = int(self.frame_count / elapsed)
-            self.setText(f"FPS: {self.fps}")
-        self.frame_count = 0
-        self.last_time = current_time
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
 
     def toggle(self):
         if self.isVisible():
             self.hide()
         else:
-            self.show()
\ No newline at end of file
+            self.show()
@@ -1,8 +1,100 @@
 # utils/gamepad_manager.py
+"""
+Entrada de gamepad para navegar la interfaz.
+
+- En Linux lee los dispositivos evdev (/dev/input/event*) directamente, sin bloquear,
+  con un selector: varios mandos a la vez y conexión/desconexión en caliente.
+- En otros sistemas usa la librería inputs en un hilo lector que se reconecta solo.
+
+D-pad y stick izquierdo (con zona muerta) se traducen a una dirección; mantenerla
+repite el paso con aceleración. Como mucho se emite un paso por frame y nunca hay
+más de uno esperando en la cola de Qt, así la grilla no se atrasa ni se inunda.
+"""
+
+import os
+import queue
+import selectors
+import struct
+import sys
 import threading
-from inputs import get_gamepad
+import time
 from PyQt5.QtCore import QObject, pyqtSignal
 
+# Zona muerta del stick analógico (0..1)
+STICK_DEADZONE = 0.35
+# Repetición al mantener una dirección: espera inicial, intervalo inicial, mínimo y aceleración
+REPEAT_DELAY = 0.35
+REPEAT_INTERVAL = 0.15
+REPEAT_MIN_INTERVAL = 0.04
+REPEAT_ACCELERATION = 0.85
+# Como mucho un paso de navegación por frame
+FRAME_INTERVAL = 1 / 60
+# Cada cuánto se buscan mandos nuevos (segundos)
+HOTPLUG_INTERVAL = 2.0
+
+# === evdev (linux/input-event-codes.h) ===
+_EVENT_FORMAT = "llHHi"
+_EVENT_SIZE = struct.calcsize(_EVENT_FORMAT)
+_EV_KEY = 0x01
+_EV_ABS = 0x03
+_ABS_X = 0x00
+_ABS_Y = 0x01
+_ABS_HAT0X = 0x10
+_ABS_HAT0Y = 0x11
+_BTN_SOUTH = 0x130
+_BTN_EAST = 0x131
+_BTN_GAMEPAD = 0x130
+_BTN_DPAD = {0x220: ("hat_y", -1), 0x221: ("hat_y", 1), 0x222: ("hat_x", -1), 0x223: ("hat_x", 1)}
+_INPUT_DIR = "/dev/input"
+_LONG_BITS = 64 if sys.maxsize > 2 ** 32 else 32
+
+
+def _eviocgabs(axis):
+    """Código ioctl EVIOCGABS(axis): _IOR('E', 0x40 + axis, struct input_absinfo)."""
+    return (2 << 30) | (24 << 16) | (ord("E") << 8) | (0x40 + axis)
+
+
+def _is_gamepad(event_name):
+    """Un dispositivo es gamepad si declara BTN_GAMEPAD en sus capacidades (sysfs)."""
+    try:
+        with open(f"/sys/class/input/{event_name}/device/capabilities/key") as f:
+            words = f.read().split()
+    except OSError:
+        return False
+    bits = 0
+    for i, word in enumerate(reversed(words)):
+        bits |= int(word, 16) << (_LONG_BITS * i)
+    return bool(bits >> _BTN_GAMEPAD & 1)
+
+
+class _NavigationRepeater:
+    """Repetición con aceleración de la dirección mantenida."""
+
+    def __init__(self):
+        self.direction = None
+        self.next_time = None
+        self.interval = REPEAT_INTERVAL
+
+    def set_direction(self, direction, now):
+        """Devuelve True si el cambio produce un paso inmediato."""
+        if direction == self.direction:
+            return False
+        self.direction = direction
+        self.interval = REPEAT_INTERVAL
+        self.next_time = now + REPEAT_DELAY if direction else None
+        return direction is not None
+
+    def due(self, now):
+        if self.direction is None or now < self.next_time:
+            return False
+        self.next_time = now + self.interval
+        self.interval = max(REPEAT_MIN_INTERVAL, self.interval * REPEAT_ACCELERATION)
+        return True
+
+    def timeout(self, now):
+        return None if self.direction is None else max(0.0, self.next_time - now)
+
+
 class GamepadManager(QObject):
     dpad_up = pyqtSignal()
     dpad_down = pyqtSignal()
@@ -10,40 +102,238 @@ class GamepadManager(QObject):
     dpad_right = pyqtSignal()
     button_a = pyqtSignal()
     button_b = pyqtSignal()
+    # Internas: del hilo lector al hilo de la UI
+    _navigate = pyqtSignal(str)
+    _pressed = pyqtSignal(str)
 
     def __init__(self):
         super().__init__()
         self.running = False
+        self.paused = False
         self.thread = None
+        self._wake_r = self._wake_w = None
+        self._state = {"hat_x": 0, "hat_y": 0, "stick_x": 0.0, "stick_y": 0.0}
+        self._repeater = _NavigationRepeater()
+        self._step_pending = False
+        self._last_step = 0.0
+        self._navigate.connect(self._dispatch_navigation)
+        self._pressed.connect(self._dispatch_button)
+
+    # === Ciclo de vida ===
 
     def start(self):
+        if self.thread and self.thread.is_alive():
+            return
         self.running = True
-        self.thread = threading.Thread(target=self._listen, daemon=True)
+        use_evdev = sys.platform.startswith("linux") and os.path.isdir(_INPUT_DIR)
+        target = self._run_evdev if use_evdev else self._run_inputs
+        self.thread = threading.Thread(target=target, daemon=True, name="gamepad")
         self.thread.start()
 
     def stop(self):
         self.running = False
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b"x")
+            except OSError:
+                pass
+
+    def pause(self):
+        """Ignora los eventos (p. ej. mientras se juega) sin cerrar los dispositivos."""
+        self.paused = True
+
+    def resume(self):
+        self._reset_state()
+        self.paused = False
+
+    # === Navegación (hilo lector) ===
+
+    def _reset_state(self):
+        self._state.update(hat_x=0, hat_y=0, stick_x=0.0, stick_y=0.0)
+        self._repeater.set_direction(None, time.monotonic())
+
+    def _direction(self):
+        s = self._state
+        if s["hat_x"] or s["hat_y"]:
+            x, y = s["hat_x"], s["hat_y"]
+        elif max(abs(s["stick_x"]), abs(s["stick_y"])) >= STICK_DEADZONE:
+            x, y = s["stick_x"], s["stick_y"]
+        else:
+            return None
+        if abs(x) >= abs(y):
+            return "right" if x > 0 else "left"
+        return "down" if y > 0 else "up"
+
+    def _handle(self, control, value, now):
+        """Aplica un control normalizado: hat_x/hat_y (-1, 0, 1), stick_x/stick_y (-1..1), a/b (1 = presionado)."""
+        if self.paused:
+            return
+        if control in ("a", "b"):
+            if value == 1:
+                self._pressed.emit(control)
+            return
+        self._state[control] = value
+        if self._repeater.set_direction(self._direction(), now):
+            self._step(now)
+
+    def _tick(self, now):
+        """Procesa la repetición pendiente y devuelve cuánto esperar hasta la próxima."""
+        if self.paused:
+            return None
+        if self._repeater.due(now):
+            self._step(now)
+        return self._repeater.timeout(now)
+
+    def _step(self, now):
+        # Si el paso anterior todavía no se procesó, o fue en este mismo frame, se descarta
+        if self._step_pending or now - self._last_step < FRAME_INTERVAL:
+            return
+        self._step_pending = True
+        self._last_step = now
+        self._navigate.emit(self._repeater.direction)
+
+    def _dispatch_navigation(self, direction):
+        self._step_pending = False
+        getattr(self, f"dpad_{direction}").emit()
+
+    def _dispatch_button(self, button):
+        getattr(self, f"button_{button}").emit()
+
+    # === Backend evdev (Linux) ===
+
+    def _run_evdev(self):
+        selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        selector.register(self._wake_r, selectors.EVENT_READ, None)
+        devices = {}  # nombre eventN -> (fd, rangos de los ejes)
+        next_scan = 0.0
+        try:
+            while self.running:
+                now = time.monotonic()
+                if now >= next_scan:
+                    self._scan_devices(selector, devices)
+                    next_scan = now + HOTPLUG_INTERVAL
+                repeat = self._tick(now)
+                timeout = max(0.0, next_scan - now)
+                if repeat is not None:
+                    timeout = min(timeout, repeat)
+                for key, _ in selector.select(timeout):
+                    if key.data is None:
+                        os.read(self._wake_r, 64)
+                        continue
+                    name, ranges = key.data
+                    if not self._read_device(key.fd, ranges):
+                        print(f"🎮 Mando desconectado ({name}).")
+                        selector.unregister(key.fd)
+                        os.close(key.fd)
+                        devices.pop(name, None)
+                        self._reset_state()
+        finally:
+            for fd, _ in devices.values():
+                if fd is not None:
+                    os.close(fd)
+            selector.close()
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._wake_r = self._wake_w = None
+
+    def _scan_devices(self, selector, devices):
+        try:
+            names = [n for n in os.listdir(_INPUT_DIR) if n.startswith("event")]
+        except OSError:
+            return
+        for name in names:
+            if name in devices or not _is_gamepad(name):
+                continue
+            try:
+                fd = os.open(os.path.join(_INPUT_DIR, name), os.O_RDONLY | os.O_NONBLOCK)
+            except OSError as e:
+                print(f"⚠️ No se pudo abrir el mando {name}: {e}")
+                devices[name] = (None, None)  # no reintentar en cada búsqueda
+                continue
+            ranges = {axis: self._axis_range(fd, axis) for axis in (_ABS_X, _ABS_Y)}
+            devices[name] = (fd, ranges)
+            selector.register(fd, selectors.EVENT_READ, (name, ranges))
+            print(f"🎮 Mando conectado ({name}).")
+
+    @staticmethod
+    def _axis_range(fd, axis):
+        try:
+            import fcntl
+            info = struct.unpack("6i", fcntl.ioctl(fd, _eviocgabs(axis), bytes(24)))
+            if info[2] > info[1]:
+                return info[1], info[2]
+        except (OSError, ImportError):
+            pass
+        return -32768, 32767
+
+    def _read_device(self, fd, ranges):
+        """Lee todos los eventos disponibles; devuelve False si el dispositivo se desconectó."""
+        while True:
+            try:
+                data = os.read(fd, _EVENT_SIZE * 64)
+            except BlockingIOError:
+                return True
+            except OSError:
+                return False
+            if not data:
+                return False
+            now = time.monotonic()
+            for offset in range(0, len(data) - _EVENT_SIZE + 1, _EVENT_SIZE):
+                _, _, ev_type, code, value = struct.unpack_from(_EVENT_FORMAT, data, offset)
+                if ev_type == _EV_ABS:
+                    if code == _ABS_HAT0X:
+                        self._handle("hat_x", value, now)
+                    elif code == _ABS_HAT0Y:
+                        self._handle("hat_y", value, now)
+                    elif code in ranges:
+                        low, high = ranges[code]
+                        normalized = 2 * (value - low) / (high - low) - 1
+                        self._handle("stick_x" if code == _ABS_X else "stick_y", normalized, now)
+                elif ev_type == _EV_KEY:
+                    if code == _BTN_SOUTH:
+                        self._handle("a", value, now)
+                    elif code == _BTN_EAST:
+                        self._handle("b", value, now)
+                    elif code in _BTN_DPAD:
+                        control, direction = _BTN_DPAD[code]
+                        self._handle(control, direction if value else 0, now)
+
+    # === Backend inputs (Windows / macOS) ===
+
+    def _run_inputs(self):
+        try:
+            from inputs import get_gamepad
+        except ImportError:
+            print("⚠️ La librería 'inputs' no está instalada: gamepad deshabilitado.")
+            return
+        events = queue.Queue()
+
+        def reader():
+            # get_gamepad() bloquea hasta el próximo evento; si no hay mando, reintentar
+            while self.running:
+                try:
+                    for event in get_gamepad():
+                        events.put(event)
+                except Exception:
+                    time.sleep(HOTPLUG_INTERVAL)
 
-    def _listen(self):
+        threading.Thread(target=reader, daemon=True, name="gamepad-reader").start()
+        mapping = {"ABS_HAT0X": "hat_x", "ABS_HAT0Y": "hat_y", "ABS_X": "stick_x", "ABS_Y": "stick_y",
+                   "BTN_SOUTH": "a", "BTN_A": "a", "BTN_EAST": "b", "BTN_B": "b"}
         while self.running:
+            timeout = self._tick(time.monotonic())
             try:
-                events = get_gamepad()
-                for event in events:
-                    if event.ev_type == "Absolute":
-                        if event.code == "ABS_HAT0Y":
-                            if event.state == -1:
-                                self.dpad_up.emit()
-                            elif event.state == 1:
-                                self.dpad_down.emit()
-                        elif event.code == "ABS_HAT0X":
-                            if event.state == -1:
-                                self.dpad_left.emit()
-                            elif event.state == 1:
-                                self.dpad_right.emit()
-                    elif event.ev_type == "Key":
-                        if event.code in ["BTN_SOUTH", "BTN_A"] and event.state == 1:
-                            self.button_a.emit()
-                        elif event.code in ["BTN_EAST", "BTN_B"] and event.state == 1:
-                            self.button_b.emit()
-            except:
-                break  # No hay gamepad conectado
\ No newline at end of file
+                event = events.get(timeout=min(timeout if timeout is not None else 0.5, 0.5))
+            except queue.Empty:
+                continue
+            control = mapping.get(event.code)
+            if control is None:
+                continue
+            value = event.state
+            if control.startswith("stick"):
+                # XInput: -32768..32767 con el eje Y hacia arriba positivo
+                value = max(-1.0, min(1.0, value / 32768))
+                if control == "stick_y":
+                    value = -value
+            self._handle(control, value, time.monotonic())
@@ -0,0 +1,171 @@
+# utils/thumbnail_cache.py
+"""
+Miniaturas de carátulas para la grilla.
+
+- Decodifica y escala en un QThreadPool (QImage es seguro fuera del hilo de la UI).
+- Guarda las miniaturas en disco, con clave ruta + mtime + tamaño + lado, para no
+  volver a decodificar la imagen original en la próxima sesión. La carpeta es un
+  LRU limitado por bytes: cada uso actualiza el mtime del archivo y se borran los
+  usados hace más tiempo.
+- Mantiene en memoria un LRU de QPixmap limitado por bytes.
+- Una carátula que no se pudo leer no se vuelve a decodificar mientras su mtime
+  no cambie; se revisa cada FAILED_RECHECK_SECONDS.
+
+get() nunca bloquea: devuelve None mientras la miniatura se prepara y emite
+thumbnail_ready(ruta) cuando está disponible.
+"""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+THUMBNAIL_DIR = Path.home() / ".multiverse" / "thumbnails"
+MEMORY_BUDGET_MB = int(os.getenv("MULTIVERSE_THUMB_CACHE_MB", "64"))
+DISK_BUDGET_MB = int(os.getenv("MULTIVERSE_THUMB_DISK_MB", "256"))
+THUMBNAIL_WORKERS = 2
+# Miniaturas nuevas entre dos recortes de la carpeta en disco
+PRUNE_EVERY = 200
+FAILED_RECHECK_SECONDS = 30
+
+
+def prune_disk_cache(budget_bytes=DISK_BUDGET_MB * 1024 * 1024, directory=THUMBNAIL_DIR):
+    """Borra las miniaturas usadas hace más tiempo hasta que la carpeta entra en budget_bytes."""
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= budget_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            continue
+
+
+class _LoaderSignals(QObject):
+    # (ruta, lado, imagen, mtime_ns de la carátula o None si no existe)
+    loaded = pyqtSignal(str, int, QImage, object)
+
+
+class _ThumbnailJob(QRunnable):
+    def __init__(self, cover_path, size, signals, failed_mtime=None):
+        super().__init__()
+        self.cover_path = cover_path
+        self.size = size
+        self.signals = signals
+        # mtime con el que la carátula ya falló: si no cambió, no se vuelve a decodificar
+        self.failed_mtime = failed_mtime
+
+    def run(self):
+        image = QImage()
+        mtime = None
+        try:
+            st = os.stat(self.cover_path)
+            mtime = st.st_mtime_ns
+            if mtime != self.failed_mtime:
+                key = f"{self.cover_path}|{st.st_mtime_ns}|{st.st_size}|{self.size}"
+                disk_path = THUMBNAIL_DIR / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+                if disk_path.exists():
+                    image.load(str(disk_path))
+                    if not image.isNull():
+                        # Marca de uso para el LRU de la carpeta
+                        os.utime(disk_path)
+                if image.isNull():
+                    source = QImage(self.cover_path)
+                    if not source.isNull():
+                        image = source.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                        THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+                        image.save(str(disk_path), "PNG")
+        except OSError:
+            pass
+        self.signals.loaded.emit(self.cover_path, self.size, image, mtime)
+
+
+class _PruneJob(QRunnable):
+    def __init__(self, budget_bytes):
+        super().__init__()
+        self.budget_bytes = budget_bytes
+
+    def run(self):
+        prune_disk_cache(self.budget_bytes)
+
+
+class ThumbnailService(QObject):
+    thumbnail_ready = pyqtSignal(str)
+
+    def __init__(self, parent=None, budget_bytes=MEMORY_BUDGET_MB * 1024 * 1024, workers=THUMBNAIL_WORKERS,
+                 disk_budget_bytes=DISK_BUDGET_MB * 1024 * 1024):
+        super().__init__(parent)
+        self.budget_bytes = budget_bytes
+        self.disk_budget_bytes = disk_budget_bytes
+        self.used_bytes = 0
+        self._cache = OrderedDict()    # (ruta, lado) -> QPixmap
+        self._pending = set()
+        self._failed = {}              # (ruta, lado) -> (mtime_ns que falló, último intento)
+        self._loaded_since_prune = 0
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(workers)
+        self._signals = _LoaderSignals()
+        self._signals.loaded.connect(self._on_loaded)
+        self._pool.start(_PruneJob(disk_budget_bytes))
+
+    def get(self, cover_path, size):
+        """Devuelve la miniatura si está en memoria; si no, la encola y devuelve None."""
+        if not cover_path:
+            return None
+        key = (cover_path, size)
+        pixmap = self._cache.get(key)
+        if pixmap is not None:
+            self._cache.move_to_end(key)
+            return pixmap
+        if key in self._pending:
+            return None
+        failed = self._failed.get(key)
+        if failed is not None and time.monotonic() - failed[1] < FAILED_RECHECK_SECONDS:
+            return None
+        self._pending.add(key)
+        self._pool.start(_ThumbnailJob(cover_path, size, self._signals, failed[0] if failed else None))
+        return None
+
+    def _on_loaded(self, cover_path, size, image, mtime):
+        key = (cover_path, size)
+        self._pending.discard(key)
+        if image.isNull():
+            self._failed[key] = (mtime, time.monotonic())
+            return
+        self._failed.pop(key, None)
+        self._loaded_since_prune += 1
+        if self._loaded_since_prune >= PRUNE_EVERY:
+            self._loaded_since_prune = 0
+            self._pool.start(_PruneJob(self.disk_budget_bytes))
+        pixmap = QPixmap.fromImage(image)
+        self._cache[key] = pixmap
+        self.used_bytes += self._cost(pixmap)
+        while self.used_bytes > self.budget_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self.used_bytes -= self._cost(evicted)
+        self.thumbnail_ready.emit(cover_path)
+
+    @staticmethod
+    def _cost(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth() // 8, 1)
+
+    def clear(self):
+        """Libera las miniaturas en memoria (la caché en disco se conserva)."""
+        self._cache.clear()
+        self._failed.clear()
+        self.used_bytes = 0